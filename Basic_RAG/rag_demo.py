@@ -9,6 +9,8 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 
+from performance.context_compression import ContextCompressor
+
 # --------------------------------------------------
 # 1. Setup LLM
 # --------------------------------------------------
@@ -32,7 +34,8 @@ except FileNotFoundError:
 # --------------------------------------------------
 text_splitter = RecursiveCharacterTextSplitter(
     chunk_size=400,
-    chunk_overlap=50
+    chunk_overlap=50,
+    add_start_index=True  # lets the compressor merge neighbouring chunks exactly
 )
 docs = text_splitter.split_documents(documents)
 
@@ -47,6 +50,9 @@ vector_store = FAISS.from_documents(docs, embeddings)
 # --------------------------------------------------
 retriever = vector_store.as_retriever(search_kwargs={"k": 4})
 
+# Merge overlapping chunks, drop repeated sentences, cap the context size
+compressor = ContextCompressor(token_budget=300)
+
 # --------------------------------------------------
 # 6. Create RAG prompt
 # --------------------------------------------------
@@ -71,6 +77,7 @@ rag_chain = (
         "context": retriever,
         "question": RunnablePassthrough()
     }
+    | compressor
     | prompt
     | llm
     | StrOutputParser()
@@ -88,4 +95,5 @@ response = rag_chain.invoke(query)
 # 9. Output
 # --------------------------------------------------
 print("Answer:")
-print(response)
\ No newline at end of file
+print(response)
+print(compressor.stats.report())
\ No newline at end of file
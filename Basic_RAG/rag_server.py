@@ -0,0 +1,361 @@
+"""Multi-process HTTP server for the RAG chains.
+
+rag_demo.py and RAG_101.PY answer one input() question at a time. This
+script serves the same retrieve -> compress -> prompt -> LLM chain over HTTP:
+
+- the parent process opens the listening socket and memory-maps one flat,
+  read-only vector index (float32 .npy + .jsonl, the layout written by
+  `vectorstore_maintenance.py export --format flat`), then forks `--workers`
+  processes that all accept on that socket and share the mapped pages,
+- each worker runs one asyncio event loop; up to `--concurrency` questions
+  per worker are in flight at once, waiting on the embedder and the LLM
+  without holding a thread,
+- the vector search itself is a NumPy matrix-vector product over the mapped
+  file, run off the event loop, and respects the record filters of
+  record_index.py when the index has record metadata.
+
+Endpoints:
+    POST /query   {"question": "..."} -> {"answer", "sources", "latency_ms", "worker"}
+    GET  /health
+    GET  /stats   per-worker counters (served by whichever worker accepts)
+
+Usage (from the Basic_RAG folder):
+    # Build the index once (embeds the file), then serve it
+    python rag_server.py --build expanded_medical_data.txt --index medical_index --workers 4
+    # Or serve an index exported from the Chroma store, without re-embedding
+    python vectorstore_maintenance.py export --format flat --out medical_index
+    python rag_server.py --index medical_index --workers 4 --concurrency 128
+    # Offline, with the fake backends from performance/fakes.py
+    python rag_server.py --build rag.txt --index /tmp/rag_index --backend fake
+
+Load test: python -m performance.loadtest --spawn --workers 4 --connections 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_community.document_loaders import TextLoader
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from performance.context_compression import ContextCompressor
+from performance.singleflight import CoalescingChatModel, CoalescingEmbeddings
+from record_index import RecordIndex, split_records
+
+MODEL_NAME = "mistral-large-3:675b-cloud"
+EMBED_MODEL = "mxbai-embed-large"
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+PROMPT = ChatPromptTemplate.from_template(
+    """
+You are an assistant that answers questions using ONLY the provided context.
+If the answer is not contained in the context, say "I don't know."
+
+Context:
+{context}
+
+Question:
+{question}
+"""
+)
+
+
+def make_backends(args: argparse.Namespace) -> tuple[Any, Any]:
+    """(embeddings, llm). Called inside each worker: HTTP clients must not cross a fork.
+
+    Both are coalescing: identical questions in flight on a worker at the same
+    time share one embedding call and one LLM call.
+    """
+    if args.backend == "fake":
+        from performance.fakes import FakeChatModel, FakeEmbeddings
+
+        embeddings = FakeEmbeddings(latency_scale=args.latency_scale, seed=os.getpid())
+        llm = FakeChatModel(latency_scale=args.latency_scale, seed=os.getpid())
+    else:
+        from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+        embeddings = OllamaEmbeddings(model=args.embed_model)
+        llm = ChatOllama(model=args.model, temperature=0.2)
+    return CoalescingEmbeddings(embeddings), CoalescingChatModel(llm)
+
+
+# --- 1. THE SHARED INDEX ---
+
+def build_index(source: Path, out: Path, embeddings: Any) -> None:
+    """Split and embed `source` the way the RAG scripts do and write a flat index."""
+    docs = TextLoader(str(source)).load()
+    if "[RECORD ID:" in docs[0].page_content:
+        docs = split_records(docs)
+        separators = ["[RECORD ID:", "\n\n", "\n", " "]
+    else:
+        separators = None
+    splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=50, separators=separators, add_start_index=True)
+    splits = splitter.split_documents(docs)
+    vectors = np.asarray(embeddings.embed_documents([d.page_content for d in splits]), dtype=np.float32)
+    np.save(out.with_suffix(".npy"), vectors)
+    with out.with_suffix(".jsonl").open("w", encoding="utf-8") as f:
+        for i, doc in enumerate(splits):
+            f.write(json.dumps({"id": str(i), "document": doc.page_content, "metadata": doc.metadata}) + "\n")
+    print(f"✅ Indexed {len(splits)} chunks from {source} into {out.with_suffix('.npy')}")
+
+
+class MmapIndex:
+    """Exact L2 search over a memory-mapped float32 matrix (what FAISS IndexFlatL2 does)."""
+
+    def __init__(self, path: Path):
+        self.vectors = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        self.docs = []
+        for line in path.with_suffix(".jsonl").open(encoding="utf-8"):
+            row = json.loads(line)
+            self.docs.append(Document(id=row["id"], page_content=row["document"], metadata=row["metadata"]))
+        if len(self.docs) != len(self.vectors):
+            raise ValueError(f"{path}: {len(self.vectors)} vectors but {len(self.docs)} records")
+        # Computed once before forking, so workers share it copy-on-write
+        self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        self.records = RecordIndex.from_documents(self.docs)
+        self._rows_by_record: dict[str, np.ndarray] = {}
+        for record_id in self.records.record_ids:
+            rows = [i for i, d in enumerate(self.docs) if d.metadata.get("record_id") == record_id]
+            self._rows_by_record[record_id] = np.asarray(rows)
+
+    def search(self, query: list[float], k: int, question: str = "") -> list[Document]:
+        q = np.asarray(query, dtype=np.float32)
+        record_ids = self.records.detect(question) if question else []
+        if record_ids:
+            rows = np.concatenate([self._rows_by_record[r] for r in record_ids])
+            distances = self.sq_norms[rows] - 2 * (self.vectors[rows] @ q)
+        else:
+            rows = None
+            distances = self.sq_norms - 2 * (self.vectors @ q)  # ||v - q||^2 minus the constant ||q||^2
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [self.docs[rows[i] if rows is not None else i] for i in top]
+
+
+# --- 2. ONE WORKER ---
+
+class RAGWorker:
+    """Answers questions on one event loop, at most `concurrency` at a time."""
+
+    def __init__(self, index: MmapIndex, args: argparse.Namespace):
+        self.index = index
+        self.k = args.k
+        self.embeddings, self.llm = make_backends(args)
+        self.chain = ContextCompressor(token_budget=args.token_budget) | PROMPT | self.llm | StrOutputParser()
+        self.limit = asyncio.Semaphore(args.concurrency)
+        self.counters = {"served": 0, "errors": 0, "in_flight": 0, "queued": 0}
+
+    async def answer(self, question: str) -> dict[str, Any]:
+        start = time.perf_counter()
+        self.counters["queued"] += 1
+        async with self.limit:
+            self.counters["queued"] -= 1
+            self.counters["in_flight"] += 1
+            try:
+                vector = await self.embeddings.aembed_query(question)
+                docs = await asyncio.to_thread(self.index.search, vector, self.k, question)
+                answer = await self.chain.ainvoke({"context": docs, "question": question})
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+            finally:
+                self.counters["in_flight"] -= 1
+        self.counters["served"] += 1
+        return {
+            "answer": answer,
+            "sources": [d.id for d in docs],
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+            "worker": os.getpid(),
+        }
+
+    # --- minimal HTTP/1.1 with keep-alive ---
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return  # client closed the connection
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "headers too large"}, keep_alive=False)
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = (request_line.split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                raw_length = headers.get("content-length") or "0"
+                if not (raw_length.isascii() and raw_length.isdigit()):
+                    # Without a valid length the body can't be framed, so the connection ends here
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, keep_alive=False)
+                    return
+                length = int(raw_length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "body too large"}, keep_alive=False)
+                    return
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return  # client closed the connection mid-body
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self._route(method, target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        path = target.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, {
+                "worker": os.getpid(), **self.counters,
+                "embeddings": self.embeddings.flight.stats(), "llm": self.llm.flight.stats(),
+            }
+        if path != "/query":
+            return 404, {"error": f"no route {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            question = json.loads(body)["question"]
+        except (ValueError, KeyError, TypeError):
+            question = None
+        if not isinstance(question, str) or not question.strip():
+            return 400, {"error": 'expected JSON {"question": "..."}'}
+        try:
+            return 200, await self.answer(question)
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: dict[str, Any], keep_alive: bool) -> None:
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  413: "Payload Too Large", 431: "Request Header Fields Too Large"}.get(status, "Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+
+async def serve(sock: socket.socket, index: MmapIndex, args: argparse.Namespace) -> None:
+    worker = RAGWorker(index, args)
+    server = await asyncio.start_server(worker.handle, sock=sock, limit=MAX_HEADER_BYTES)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    async with server:
+        await stop.wait()
+
+
+def run_worker(sock: socket.socket, index: MmapIndex, args: argparse.Namespace) -> None:
+    asyncio.run(serve(sock, index, args))
+
+
+# --- 3. PRE-FORK SUPERVISOR ---
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the RAG chain over HTTP with a pre-fork worker pool.")
+    parser.add_argument("--index", type=Path, required=True, help="Flat index path (without .npy/.jsonl)")
+    parser.add_argument("--build", type=Path, help="Text file to embed into --index first")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64, help="Questions in flight per worker")
+    parser.add_argument("--k", type=int, default=4, help="Chunks retrieved per question")
+    parser.add_argument("--token-budget", type=int, default=300, help="Context token budget")
+    parser.add_argument("--backend", choices=("ollama", "fake"), default="ollama")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--embed-model", default=EMBED_MODEL)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Fake backend latency multiplier")
+    args = parser.parse_args()
+
+    if args.build:
+        embeddings, _ = make_backends(args)
+        build_index(args.build, args.index, embeddings)
+    index = MmapIndex(args.index)
+
+    sock = socket.create_server((args.host, args.port), backlog=4096)
+    print(f"🚀 Serving {len(index.docs)} chunks on http://{args.host}:{args.port} "
+          f"({args.workers} workers x {args.concurrency} concurrent)", flush=True)
+
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        try:
+            run_worker(sock, index, args)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    children: set[int] = set()
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(sock, index, args)
+            except BaseException:  # noqa: BLE001 - a crashed worker is restarted by the parent
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def shutdown(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    for _ in range(args.workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"⚠️  Worker {pid} exited ({status}), restarting", flush=True)
+            time.sleep(0.5)  # don't spin if workers crash on start
+            spawn()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
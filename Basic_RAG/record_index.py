@@ -0,0 +1,124 @@
+"""Record-level metadata for the medical notes, and retrieval filtered by it.
+
+expanded_medical_data.txt is a list of records:
+
+    [RECORD ID: 003]
+    Patient Name: Michael Kamau
+    ...
+
+`split_records` cuts the file on those headers *before* chunking and stamps
+every chunk with `record_id` and `patient_name`, so the metadata survives the
+text splitter. `RecordIndex` maps IDs and name parts to record IDs; it is
+built from the chunks at ingestion (no model calls, so it is not persisted).
+At query time `RecordFilteredRetriever` looks for record IDs / patient
+names in the question and, when it finds any, runs the
+vector search only over those records' chunks; otherwise it searches
+everything as before.
+
+Usage:
+    records = split_records(loader.load())
+    splits = text_splitter.split_documents(records)
+    index = RecordIndex.from_documents(splits)
+    retriever = RecordFilteredRetriever(vectorstore=vectorstore, index=index, k=2)
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+RECORD_HEADER = re.compile(r"\[RECORD ID:\s*(\w+)\]")
+PATIENT_NAME = re.compile(r"Patient Name:\s*(.+)")
+# "record 3", "record id: 003", "ID 003", "#3"
+RECORD_MENTION = re.compile(r"(?:\brecord(?:\s+id)?|\bid|#)\s*[:#]?\s*(\d+)\b", re.IGNORECASE)
+# Letters only, so "Michael's" -> "michael", "s" and "O'Brien" -> "o", "brien"
+WORD = re.compile(r"[a-z]+")
+
+
+# --- 1. INGESTION ---
+
+def split_records(docs: list[Document]) -> list[Document]:
+    """One Document per record, with record_id / patient_name metadata."""
+    records = []
+    for doc in docs:
+        for part in re.split(r"(?=\[RECORD ID:)", doc.page_content):
+            if not part.strip():
+                continue
+            metadata = dict(doc.metadata)
+            header = RECORD_HEADER.search(part)
+            if header:
+                metadata["record_id"] = header.group(1)
+                name = PATIENT_NAME.search(part)
+                if name:
+                    metadata["patient_name"] = name.group(1).strip()
+            records.append(Document(page_content=part, metadata=metadata))
+    return records
+
+
+class RecordIndex:
+    """Record ID and patient-name lookup, built once at ingestion."""
+
+    def __init__(self, names: dict[str, list[str]], record_ids: list[str]):
+        self.names = names  # lowercased full name / name part -> record IDs
+        self.record_ids = sorted(record_ids)
+        self._by_number = {int(r): r for r in self.record_ids if r.isdigit()}
+
+    @classmethod
+    def from_documents(cls, docs: list[Document]) -> "RecordIndex":
+        names: dict[str, set[str]] = defaultdict(set)
+        record_ids = set()
+        for doc in docs:
+            record_id = doc.metadata.get("record_id")
+            if record_id is None:
+                continue
+            record_ids.add(record_id)
+            name = doc.metadata.get("patient_name", "").lower()
+            if name:
+                names[name].add(record_id)
+                for part in WORD.findall(name):
+                    if len(part) > 1:  # skip initials and the "o" of O'Brien
+                        names[part].add(record_id)
+        return cls({k: sorted(v) for k, v in names.items()}, list(record_ids))
+
+    # --- 2. QUERY-TIME ENTITY DETECTION ---
+
+    def detect(self, question: str) -> list[str]:
+        """Record IDs the question refers to, by ID or patient name."""
+        found = set()
+        for number in RECORD_MENTION.findall(question):
+            record_id = self._by_number.get(int(number))
+            if record_id:
+                found.add(record_id)
+
+        text = question.lower()
+        full_names = [name for name in self.names if " " in name and name in text]
+        if full_names:
+            # "John Doe" is more specific than "John" + "Doe" matched separately
+            for name in full_names:
+                found.update(self.names[name])
+        else:
+            for word in WORD.findall(text):
+                found.update(self.names.get(word, ()))
+        return sorted(found)
+
+
+# --- 3. FILTERED RETRIEVAL ---
+
+class RecordFilteredRetriever(BaseRetriever):
+    """Vector search restricted to the records named in the question."""
+
+    vectorstore: VectorStore
+    index: RecordIndex
+    k: int = 2
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        record_ids = self.index.detect(query)
+        if not record_ids:
+            return self.vectorstore.similarity_search(query, k=self.k)
+        # Chroma applies the metadata filter before the nearest-neighbour search
+        return self.vectorstore.similarity_search(query, k=self.k, filter={"record_id": {"$in": record_ids}})
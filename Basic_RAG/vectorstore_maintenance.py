@@ -0,0 +1,321 @@
+"""Maintenance command for the persisted Chroma store (chroma_db_expanded).
+
+Older versions of RAG_101.PY appended every chunk again on each run, so the
+collection fills up with duplicate embeddings and the HNSW segment and SQLite
+file keep growing. This tool cleans that up and moves vectors between
+backends without calling the embedding model again.
+
+Usage (from the Basic_RAG folder):
+    python vectorstore_maintenance.py stats
+    python vectorstore_maintenance.py dedupe [--dry-run]
+    python vectorstore_maintenance.py compact            # dedupe + rebuild HNSW + vacuum
+    python vectorstore_maintenance.py vacuum
+    python vectorstore_maintenance.py export --format flat  --out medical   # medical.npy + medical.jsonl
+    python vectorstore_maintenance.py export --format faiss --out medical_faiss
+    python vectorstore_maintenance.py import --format flat  --path medical
+
+The flat format is a float32 .npy matrix (open it with
+np.load(path, mmap_mode="r")) plus a .jsonl file with one
+{"id", "document", "metadata"} line per row, in the same order. The faiss
+format is what LangChain's FAISS.save_local writes, so
+FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+picks it up directly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import chromadb
+import numpy as np
+
+DB_DIR = Path(__file__).resolve().parent / "chroma_db_expanded"
+COLLECTION = "langchain"  # LangChain's Chroma default
+EMBED_MODEL = "mxbai-embed-large"
+STAGING_SUFFIX = "__compact"
+# HNSW segments live in a directory named after their segment id
+SEGMENT_DIR = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def content_hash(text: str) -> str:
+    """Stable id for a chunk: the same text always gets the same id."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# --- 1. READING THE COLLECTION ---
+
+def open_collection(db_dir: Path, name: str):
+    client = chromadb.PersistentClient(path=str(db_dir))
+    recover_compact(client, name)
+    return client, client.get_collection(name)
+
+
+def recover_compact(client, name: str) -> None:
+    """Finish a compact that died between dropping the old collection and
+    renaming the new one. The staging collection only outlives the original
+    once it has been checked to hold every record, so it is safe to promote."""
+    names = [c.name for c in client.list_collections()]
+    if name not in names and name + STAGING_SUFFIX in names:
+        client.get_collection(name + STAGING_SUFFIX).modify(name=name)
+        print(f"Recovered {name} from an interrupted compact.")
+
+
+def fetch_all(collection, include_embeddings: bool = True) -> dict[str, Any]:
+    """Read every record, page by page, in insertion order."""
+    include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+    out: dict[str, list] = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+    page, offset = 1000, 0
+    while True:
+        batch = collection.get(include=include, limit=page, offset=offset)
+        if not batch["ids"]:
+            break
+        out["ids"] += batch["ids"]
+        out["documents"] += batch["documents"]
+        out["metadatas"] += batch["metadatas"]
+        if include_embeddings:
+            out["embeddings"] += list(batch["embeddings"])
+        offset += page
+    return out
+
+
+def add_in_batches(client, collection, ids, embeddings, documents, metadatas) -> None:
+    step = client.get_max_batch_size()
+    for start in range(0, len(ids), step):
+        end = start + step
+        collection.upsert(
+            ids=ids[start:end],
+            embeddings=[list(map(float, e)) for e in embeddings[start:end]],
+            documents=documents[start:end],
+            metadatas=metadatas[start:end] or None,
+        )
+
+
+def disk_usage(db_dir: Path) -> int:
+    return sum(p.stat().st_size for p in db_dir.rglob("*") if p.is_file())
+
+
+# --- 2. COMMANDS ---
+
+def unique_rows(records: dict[str, Any]) -> list[int]:
+    """One row per distinct text. A row already stored under its content-hash
+    id (as RAG_101.PY writes them) wins over older random-id copies."""
+    best: dict[str, int] = {}
+    for i, (record_id, document) in enumerate(zip(records["ids"], records["documents"])):
+        digest = content_hash(document or "")
+        if digest not in best or record_id == digest:
+            best[digest] = i
+    return sorted(best.values())
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    client, collection = open_collection(args.db, args.collection)
+    records = fetch_all(collection, include_embeddings=False)
+    unique = len(unique_rows(records))
+    print(f"Collection:  {args.collection} @ {args.db}")
+    print(f"Records:     {len(records['ids'])}")
+    print(f"Unique:      {unique}")
+    print(f"Duplicates:  {len(records['ids']) - unique}")
+    print(f"Disk usage:  {disk_usage(args.db) / 1024:.1f} KiB")
+
+
+def cmd_dedupe(args: argparse.Namespace) -> None:
+    """Keep one record per text, stored under its content-hash id, so the next
+    RAG_101.PY run recognises it instead of deleting and re-embedding it."""
+    client, collection = open_collection(args.db, args.collection)
+    records = fetch_all(collection, include_embeddings=not args.dry_run)
+    rows = unique_rows(records)
+    rekey = [i for i in rows if records["ids"][i] != content_hash(records["documents"][i] or "")]
+    drop = set(records["ids"]) - {records["ids"][i] for i in rows if i not in rekey}
+    if args.dry_run or not drop:
+        suffix = " (dry run, nothing changed)" if drop else ""
+        print(f"{len(records['ids']) - len(rows)} duplicate records, {len(rekey)} to re-key{suffix}.")
+        return
+    # Write the re-keyed copies before deleting anything
+    add_in_batches(
+        client, collection,
+        [content_hash(records["documents"][i] or "") for i in rekey],
+        [records["embeddings"][i] for i in rekey],
+        [records["documents"][i] for i in rekey],
+        [records["metadatas"][i] or {} for i in rekey],
+    )
+    drop = list(drop)
+    step = client.get_max_batch_size()
+    for start in range(0, len(drop), step):
+        collection.delete(ids=drop[start:start + step])
+    print(f"Deleted {len(records['ids']) - len(rows)} duplicate records, re-keyed {len(rekey)}.")
+
+
+def vacuum(db_dir: Path) -> None:
+    # Must run with no Chroma client holding the database open.
+    gc.collect()
+    db = sqlite3.connect(str(db_dir / "chroma.sqlite3"))
+    try:
+        db.execute("VACUUM")
+    finally:
+        db.close()
+
+
+def remove_orphan_segments(db_dir: Path) -> int:
+    """Delete segment directories the segments table no longer points to
+    (Chroma leaves them behind when a collection is deleted)."""
+    db = sqlite3.connect(str(db_dir / "chroma.sqlite3"))
+    try:
+        live = {row[0] for row in db.execute("SELECT id FROM segments")}
+    finally:
+        db.close()
+    removed = 0
+    for path in db_dir.iterdir():
+        if path.is_dir() and SEGMENT_DIR.fullmatch(path.name) and path.name not in live:
+            shutil.rmtree(path)
+            removed += 1
+    return removed
+
+
+def cmd_vacuum(args: argparse.Namespace) -> None:
+    before = disk_usage(args.db)
+    vacuum(args.db)
+    removed = remove_orphan_segments(args.db)
+    print(f"Vacuumed ({removed} orphaned segment directories removed): {before / 1024:.1f} KiB -> {disk_usage(args.db) / 1024:.1f} KiB")
+
+
+def cmd_compact(args: argparse.Namespace) -> None:
+    """Dedupe into a fresh collection so the HNSW index is rebuilt from the
+    surviving vectors only (deleted vectors otherwise stay in the graph).
+
+    The new collection is filled under a temporary name and only swapped in
+    once it holds every record. A failure while filling it leaves the original
+    untouched; if the process dies during the swap itself, the next command
+    run by this tool promotes the finished staging collection (see
+    recover_compact).
+    """
+    before = disk_usage(args.db)
+    client, collection = open_collection(args.db, args.collection)
+    records = fetch_all(collection)
+    rows = unique_rows(records)
+    staging_name = args.collection + STAGING_SUFFIX
+    if staging_name in [c.name for c in client.list_collections()]:
+        client.delete_collection(staging_name)  # left over from an interrupted run
+    staging = client.create_collection(staging_name, metadata=collection.metadata)
+    try:
+        add_in_batches(
+            client, staging,
+            [content_hash(records["documents"][i] or "") for i in rows],
+            [records["embeddings"][i] for i in rows],
+            [records["documents"][i] for i in rows],
+            [records["metadatas"][i] or {} for i in rows],
+        )
+        if staging.count() != len(rows):
+            raise RuntimeError(f"rebuilt collection has {staging.count()} records, expected {len(rows)}")
+    except BaseException:
+        client.delete_collection(staging_name)
+        raise
+
+    client.delete_collection(args.collection)
+    staging.modify(name=args.collection)
+    kept = staging.count()
+    del client, collection, staging
+    vacuum(args.db)
+    remove_orphan_segments(args.db)  # the old collection's HNSW files
+    print(f"Rebuilt {args.collection}: {len(records['ids'])} -> {kept} records, "
+          f"{before / 1024:.1f} KiB -> {disk_usage(args.db) / 1024:.1f} KiB")
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    client, collection = open_collection(args.db, args.collection)
+    records = fetch_all(collection)
+    vectors = np.asarray(records["embeddings"], dtype=np.float32)
+    out = Path(args.out)
+
+    if args.format == "flat":
+        np.save(out.with_suffix(".npy"), vectors)
+        with out.with_suffix(".jsonl").open("w", encoding="utf-8") as f:
+            for record_id, document, metadata in zip(records["ids"], records["documents"], records["metadatas"]):
+                f.write(json.dumps({"id": record_id, "document": document, "metadata": metadata or {}}) + "\n")
+        print(f"Wrote {len(vectors)} vectors to {out.with_suffix('.npy')} (+ .jsonl)")
+        return
+
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+    from langchain_ollama import OllamaEmbeddings
+
+    index = faiss.IndexFlatL2(vectors.shape[1])  # same index type FAISS.from_documents builds
+    index.add(vectors)
+    store = FAISS(
+        embedding_function=OllamaEmbeddings(model=EMBED_MODEL),  # only used for future queries
+        index=index,
+        docstore=InMemoryDocstore({
+            record_id: Document(id=record_id, page_content=document, metadata=metadata or {})
+            for record_id, document, metadata in zip(records["ids"], records["documents"], records["metadatas"])
+        }),
+        index_to_docstore_id=dict(enumerate(records["ids"])),
+    )
+    store.save_local(str(out))
+    print(f"Wrote FAISS index with {index.ntotal} vectors to {out}/")
+
+
+def cmd_import(args: argparse.Namespace) -> None:
+    path = Path(args.path)
+    if args.format == "flat":
+        vectors = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        rows = [json.loads(line) for line in path.with_suffix(".jsonl").open(encoding="utf-8")]
+        ids = [r["id"] for r in rows]
+        documents = [r["document"] for r in rows]
+        metadatas = [r["metadata"] for r in rows]
+    else:
+        from langchain_community.vectorstores import FAISS
+        from langchain_ollama import OllamaEmbeddings
+
+        # index.pkl is a pickle: only import FAISS directories you created yourself.
+        store = FAISS.load_local(str(path), OllamaEmbeddings(model=EMBED_MODEL), allow_dangerous_deserialization=True)
+        vectors = store.index.reconstruct_n(0, store.index.ntotal)
+        ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+        docs = [store.docstore.search(record_id) for record_id in ids]
+        documents = [d.page_content for d in docs]
+        metadatas = [d.metadata for d in docs]
+
+    client = chromadb.PersistentClient(path=str(args.db))
+    recover_compact(client, args.collection)
+    collection = client.get_or_create_collection(args.collection)
+    add_in_batches(client, collection, ids, vectors, documents, metadatas)
+    print(f"Imported {len(ids)} vectors into {args.collection} (now {collection.count()} records)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deduplicate, compact, export and import the Chroma store.")
+    parser.add_argument("--db", type=Path, default=DB_DIR, help="Chroma persist directory")
+    parser.add_argument("--collection", default=COLLECTION)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Record, duplicate and disk usage counts").set_defaults(func=cmd_stats)
+    dedupe = sub.add_parser("dedupe", help="Delete records whose text is a duplicate")
+    dedupe.add_argument("--dry-run", action="store_true")
+    dedupe.set_defaults(func=cmd_dedupe)
+    sub.add_parser("compact", help="Dedupe, rebuild the HNSW segment and vacuum").set_defaults(func=cmd_compact)
+    sub.add_parser("vacuum", help="VACUUM chroma.sqlite3").set_defaults(func=cmd_vacuum)
+
+    export = sub.add_parser("export", help="Export vectors without re-embedding")
+    export.add_argument("--format", choices=("flat", "faiss"), default="flat")
+    export.add_argument("--out", required=True)
+    export.set_defaults(func=cmd_export)
+
+    imp = sub.add_parser("import", help="Import vectors exported by this tool")
+    imp.add_argument("--format", choices=("flat", "faiss"), default="flat")
+    imp.add_argument("--path", required=True)
+    imp.set_defaults(func=cmd_import)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 from typing import List, Literal
 from langchain_ollama import ChatOllama
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain_core.runnables import RunnableLambda
 from pydantic import BaseModel, Field
 import textwrap
 
+from performance.prompt_registry import registry
+from performance.llm_cache import install_llm_cache
+
+install_llm_cache()
+
 # --- 1. SET UP THE MODEL ---
 # Using json format ensures our Pydantic parsers work reliably
 model = ChatOllama(model="mistral-large-3:675b-cloud", temperature=0.1, format="json")
@@ -35,20 +39,22 @@ final_parser = PydanticOutputParser(pydantic_object=FinalArticle)
 # --- 4. DEFINE PROMPTS ---
 
 # Prompt 1: The Router (The "Brain")
-router_prompt = ChatPromptTemplate.from_messages([
+# The registry renders each schema's format instructions once (cached on disk)
+# and only when the prompt is first formatted, not at import time.
+router_prompt = registry.chat_prompt([
     ("system", "You are a content strategist. Categorize the topic.\n{format_instructions}"),
     ("human", "Topic: {topic}")
-]).partial(format_instructions=router_parser.get_format_instructions())
+], parser=router_parser)
 
 # Prompt 2a: Educational Path
-edu_prompt = ChatPromptTemplate.from_messages([
+edu_prompt = registry.chat_prompt([
     ("system", "You are a professor. Write a factual, neutral explanation about {topic}.\n{format_instructions}"),
-]).partial(format_instructions=final_parser.get_format_instructions())
+], parser=final_parser)
 
 # Prompt 2b: Persuasive Path
-persuade_prompt = ChatPromptTemplate.from_messages([
+persuade_prompt = registry.chat_prompt([
     ("system", "You are an influencer. Write a strong, opinionated argument about {topic}.\n{format_instructions}"),
-]).partial(format_instructions=final_parser.get_format_instructions())
+], parser=final_parser)
 
 # --- 5. LOGIC AND CHAINING ---
 
@@ -2,6 +2,10 @@ from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from performance.llm_cache import install_llm_cache
+
+install_llm_cache()
+
 
 llm = ChatOllama(model="mistral-large-3:675b-cloud", temperature=0.2)
 prompt = ChatPromptTemplate.from_template("Explain {topic}")
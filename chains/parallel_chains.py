@@ -3,6 +3,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableParallel, RunnablePassthrough
 
+from performance.llm_cache import install_llm_cache
+
+install_llm_cache()
+
 # 1. Setup Model
 model = ChatOllama(model="mistral-large-3:675b-cloud", temperature=0.2)
 
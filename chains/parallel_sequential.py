@@ -1,11 +1,15 @@
 from typing import List
 from langchain_ollama import ChatOllama
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableParallel, RunnablePassthrough
 from pydantic import BaseModel, Field
 import textwrap
 
+from performance.prompt_registry import registry
+from performance.llm_cache import install_llm_cache
+
+install_llm_cache()
+
 # 1. Setup Model l
 model = ChatOllama(model="gemma3:27b-cloud", temperature=0.1, format="json")
 
@@ -30,13 +34,16 @@ tech_parser = PydanticOutputParser(pydantic_object=TechSpec)
 final_parser = PydanticOutputParser(pydantic_object=LaunchPlan)
 
 # 4. Define Specialized Chains
-marketing_prompt = ChatPromptTemplate.from_template(
-    "You are a marketing expert. Create a pitch for: {product_name}\n{format_instructions}"
-).partial(format_instructions=marketing_parser.get_format_instructions())
+# The registry renders format instructions lazily and caches them per schema
+marketing_prompt = registry.from_template(
+    "You are a marketing expert. Create a pitch for: {product_name}\n{format_instructions}",
+    parser=marketing_parser,
+)
 
-tech_prompt = ChatPromptTemplate.from_template(
-    "You are a CTO. Create technical specs for: {product_name}\n{format_instructions}"
-).partial(format_instructions=tech_parser.get_format_instructions())
+tech_prompt = registry.from_template(
+    "You are a CTO. Create technical specs for: {product_name}\n{format_instructions}",
+    parser=tech_parser,
+)
 
 marketing_chain = marketing_prompt | model | marketing_parser
 tech_chain = tech_prompt | model | tech_parser
@@ -50,14 +57,15 @@ parallel_brainstorm = RunnableParallel(
 )
 
 # 6. SEQUENTIAL STEP: Combine the parallel results into a final plan
-strategy_prompt = ChatPromptTemplate.from_template(
+strategy_prompt = registry.from_template(
     """You are a CEO. Review the marketing and tech data to create a launch plan for {product_name}.
     
     Marketing Data: {marketing}
     Technical Data: {tech}
     
-    {format_instructions}"""
-).partial(format_instructions=final_parser.get_format_instructions())
+    {format_instructions}""",
+    parser=final_parser,
+)
 
 # 7. ASSEMBLE THE COMPLETE ARCHITECTURE
 # This is a Sequential Chain where the first step is actually two Parallel chains
@@ -1,10 +1,14 @@
 from typing import List
 from langchain_ollama import ChatOllama
-from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnablePassthrough
 
+from performance.prompt_registry import registry
+from performance.llm_cache import install_llm_cache
+
+install_llm_cache()
+
 # 1. Setup Model
 model = ChatOllama(model="mistral-large-3:675b-cloud", temperature=0.2, format="json")
 
@@ -25,13 +29,14 @@ parser_1 = PydanticOutputParser(pydantic_object=ResearchPaper)
 parser_2 = PydanticOutputParser(pydantic_object=RefinedResearch)
 
 # 4. Define Prompt 1: Initial Research
-prompt_1 = ChatPromptTemplate.from_messages([
+# Format instructions are rendered lazily and cached per schema by the registry
+prompt_1 = registry.chat_prompt([
     ("system", "You are a research assistant.\n{format_instructions}"),
     ("human", "Research the topic of {topic}")
-]).partial(format_instructions=parser_1.get_format_instructions())
+], parser=parser_1)
 
 # 5. Define Prompt 2: Refinement
-prompt_2 = ChatPromptTemplate.from_messages([
+prompt_2 = registry.chat_prompt([
     ("system", "You are a senior editor specializing in {topic}.\n{format_instructions}"),
     ("human", """
     The user wanted research on: {topic}
@@ -42,7 +47,7 @@ prompt_2 = ChatPromptTemplate.from_messages([
     Please refine this. Ensure the title is punchy and the summary accurately 
     reflects the core principles of {topic}. Provide a critique of what was missing.
     """)
-]).partial(format_instructions=parser_2.get_format_instructions())
+], parser=parser_2)
 
 # 6. Build the Sequential Chain
 # Chain 1: Research
@@ -2,9 +2,18 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from dotenv import load_dotenv
 
+from performance.scheduler import get_scheduler
+
 load_dotenv()
 
-model = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+# Route calls through the shared scheduler: rate limited, retried with backoff,
+# and served from the interactive lane ahead of any batch work
+scheduler = get_scheduler(rate_limits={"chat-google-generative-ai": 1.0})
+model = scheduler.wrap(
+    ChatGoogleGenerativeAI(model="gemini-2.5-flash"),
+    priority="interactive",
+    timeout=60,
+)
 
 chat_history = [
     SystemMessage(content="You are a helpful assistant."),
@@ -2,6 +2,11 @@ from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from performance.llm_cache import install_llm_cache
+from performance.cascade import ModelCascade, escalation_report, min_length
+
+install_llm_cache()
+
 
 # The "Smart" model for deep understanding
 smart_model = ChatOllama(model="mistral-large-3:675b-cloud", temperature=0.2)
@@ -9,12 +14,23 @@ smart_model = ChatOllama(model="mistral-large-3:675b-cloud", temperature=0.2)
 # The "Fast" model for the quick summary
 fast_model = ChatOllama(model="gemma3:27b-cloud", temperature=0)
 
+# The first step tries the fast model and only escalates to the smart one
+# when the answer is too short to be a real explanation. The rendered prompt
+# changes with {subject}, so name it to keep its escalation stats together.
+explain_model = ModelCascade(
+    fast=fast_model,
+    smart=smart_model,
+    validators=[min_length(200)],
+    name="explain",
+).with_config(metadata={"prompt": "what_is_subject"})
+
 template1 = PromptTemplate.from_template("What is {subject} about?")
 template2 = PromptTemplate.from_template("Write summary on {subject}")
 
 parser = StrOutputParser()
 
-chain = template1 | smart_model | parser | template2 | fast_model | parser
+chain = template1 | explain_model | parser | template2 | fast_model | parser
 final_output = chain.invoke({"subject": "LangChain"})
 
-print(final_output)
\ No newline at end of file
+print(final_output)
+print(escalation_report())
@@ -1,10 +1,14 @@
 from typing import List
 from pydantic import BaseModel, Field
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain.output_parsers import OutputFixingParser 
 from langchain_ollama import ChatOllama
 
+from performance.prompt_registry import registry
+from performance.llm_cache import install_llm_cache
+
+install_llm_cache()
+
 # 1. Setup the Model
 model = ChatOllama(model="mistral-large-3:675b-cloud", format="json")
 
@@ -20,12 +24,12 @@ parser = PydanticOutputParser(pydantic_object=ResearchPaper)
 fix_parser = OutputFixingParser.from_llm(parser=parser, llm=model)
 
 # 4. Prepare Prompt
-prompt = ChatPromptTemplate.from_messages([
+# The registry caches the rendered schema instructions on disk and only
+# renders them when the prompt is first formatted.
+prompt_with_instructions = registry.chat_prompt([
     ("system", "You are a research assistant.\n{format_instructions}"),
     ("human", "Research the topic of {topic}")
-])
-
-prompt_with_instructions = prompt.partial(format_instructions=parser.get_format_instructions())
+], parser=parser)
 
 # 5. The Chain (Using fix_parser instead of parser)
 chain = prompt_with_instructions | model | fix_parser
@@ -0,0 +1 @@
+"""Shared performance helpers (caching, batching, scheduling, tracing) for the example scripts."""
@@ -0,0 +1,305 @@
+"""Offline benchmark for the RAG, chain and summarization pipelines.
+
+Runs the same building blocks as Basic_RAG/*.py, chains/*.py and
+summarization/summarization.py, but with FakeChatModel / FakeEmbeddings in
+place of Ollama, and times every stage separately:
+
+    load -> split -> embed -> index -> retrieve -> compress -> prompt -> generate -> parse
+
+Results are written as JSON so two commits can be compared in CI:
+
+    python -m performance.benchmark --output bench.json
+    python -m performance.benchmark --compare bench.json --fail-on-regression
+
+Use --latency-scale 0 to drop the simulated model latency and measure only
+our own (and LangChain's) overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, List
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pydantic import BaseModel, Field
+
+from performance.context_compression import ContextCompressor
+from performance.fakes import FakeChatModel, FakeEmbeddings, json_responder
+from performance.prompt_registry import PromptRegistry
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "Basic_RAG"
+# record_index is a module of the RAG scripts, not of this package
+sys.path.insert(0, str(DATA_DIR))
+from record_index import RecordFilteredRetriever, RecordIndex, split_records  # noqa: E402
+
+RAG_QUERIES = [
+    "What is Retrieval-Augmented Generation and why is it useful?",
+    "How does the retriever pick context?",
+    "What are the limitations of RAG?",
+]
+MEDICAL_QUERIES = [
+    "What does Michael have?",
+    "Who broke their wrist?",
+    "Which patient is on Metformin?",
+]
+
+
+# --- 1. TIMING ---
+
+class StageTimer:
+    """Collects wall-clock samples per stage name."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        out = {}
+        for name, values in self.samples.items():
+            ms = sorted(v * 1000 for v in values)
+            out[name] = {
+                "n": len(ms),
+                "mean_ms": round(statistics.fmean(ms), 3),
+                "median_ms": round(statistics.median(ms), 3),
+                "p95_ms": round(ms[min(len(ms) - 1, int(0.95 * len(ms)))], 3),
+                "min_ms": round(ms[0], 3),
+            }
+        return out
+
+
+# --- 2. PIPELINES ---
+
+RAG_PROMPT = ChatPromptTemplate.from_template(
+    """
+You are an assistant that answers questions using ONLY the provided context.
+If the answer is not contained in the context, say "I don't know."
+
+Context:
+{context}
+
+Question:
+{question}
+"""
+)
+
+
+def _load(path: Path) -> list[Document]:
+    # Same result as TextLoader(path).load(), without the loader machinery.
+    return [Document(page_content=path.read_text(encoding="utf-8"), metadata={"source": str(path)})]
+
+
+def _rag(
+    timer: StageTimer,
+    args: argparse.Namespace,
+    path: Path,
+    queries: list[str],
+    k: int,
+    token_budget: int,
+    separators=None,
+    records: bool = False,
+):
+    llm = FakeChatModel(latency_scale=args.latency_scale, seed=args.seed)
+    embeddings = FakeEmbeddings(latency_scale=args.latency_scale, seed=args.seed)
+    parser = StrOutputParser()
+    compressor = ContextCompressor(token_budget=token_budget)
+
+    with timer.stage("load"):
+        documents = _load(path)
+    with timer.stage("split"):
+        if records:
+            documents = split_records(documents)
+        splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=50, separators=separators, add_start_index=True)
+        docs = splitter.split_documents(documents)
+    with timer.stage("embed"):
+        vectors = embeddings.embed_documents([d.page_content for d in docs])
+    with timer.stage("index"):
+        store = FAISS.from_embeddings(
+            list(zip([d.page_content for d in docs], vectors)),
+            embeddings,
+            metadatas=[d.metadata for d in docs],
+        )
+        if records:
+            retriever = RecordFilteredRetriever(vectorstore=store, index=RecordIndex.from_documents(docs), k=k)
+        else:
+            retriever = store.as_retriever(search_kwargs={"k": k})
+
+    for query in queries:
+        with timer.stage("retrieve"):
+            context = retriever.invoke(query)
+        with timer.stage("compress"):
+            inputs = compressor.invoke({"context": context, "question": query})
+        with timer.stage("prompt"):
+            prompt_value = RAG_PROMPT.invoke(inputs)
+        with timer.stage("generate"):
+            message = llm.invoke(prompt_value)
+        with timer.stage("parse"):
+            parser.invoke(message)
+
+
+def rag_demo(timer: StageTimer, args: argparse.Namespace) -> None:
+    """Basic_RAG/rag_demo.py: rag.txt, FAISS, k=4."""
+    _rag(timer, args, DATA_DIR / "rag.txt", RAG_QUERIES, k=4, token_budget=300)
+
+
+def medical_rag(timer: StageTimer, args: argparse.Namespace) -> None:
+    """Basic_RAG/RAG_101.PY: split per record, k=2 filtered to the records a question names."""
+    _rag(
+        timer, args, DATA_DIR / "expanded_medical_data.txt", MEDICAL_QUERIES, k=2, token_budget=400,
+        separators=["[RECORD ID:", "\n\n", "\n", " "], records=True,
+    )
+
+
+class ResearchPaper(BaseModel):
+    title: str = Field(description="A catchy title")
+    summary: str = Field(description="A 2-sentence summary")
+    tags: List[str] = Field(description="3 keywords")
+
+
+def structured_chain(timer: StageTimer, args: argparse.Namespace) -> None:
+    """chains/sequential_chains.py step 1: prompt -> JSON model -> PydanticOutputParser."""
+    reply = {"title": "Quantum Mechanics", "summary": "Small things. Behave oddly.", "tags": ["a", "b", "c"]}
+    llm = FakeChatModel(latency_scale=args.latency_scale, seed=args.seed, responder=json_responder(reply))
+    parser = PydanticOutputParser(pydantic_object=ResearchPaper)
+    registry = PromptRegistry(cache_path=None)  # cold, and isolated from the scripts' cache
+
+    with timer.stage("prompt_build"):
+        prompt = registry.chat_prompt([
+            ("system", "You are a research assistant.\n{format_instructions}"),
+            ("human", "Research the topic of {topic}"),
+        ], parser=parser)
+
+    for topic in ("Quantum Mechanics", "Black Holes", "Photosynthesis"):
+        with timer.stage("prompt"):
+            prompt_value = prompt.invoke({"topic": topic})
+        with timer.stage("generate"):
+            message = llm.invoke(prompt_value)
+        with timer.stage("parse"):
+            parser.invoke(message)
+
+
+def summarize(timer: StageTimer, args: argparse.Namespace) -> None:
+    """summarization/summarization.py map_reduce: summarize chunks, then combine."""
+    llm = FakeChatModel(latency_scale=args.latency_scale, seed=args.seed)
+    map_chain = ChatPromptTemplate.from_template("Write a concise summary of:\n{text}") | llm | StrOutputParser()
+    reduce_chain = ChatPromptTemplate.from_template("Combine these summaries:\n{text}") | llm | StrOutputParser()
+
+    with timer.stage("load"):
+        documents = _load(DATA_DIR / "expanded_medical_data.txt")
+    with timer.stage("split"):
+        docs = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=200).split_documents(documents)
+    with timer.stage("generate_map"):
+        partials = map_chain.batch([{"text": d.page_content} for d in docs])
+    with timer.stage("generate_reduce"):
+        reduce_chain.invoke({"text": "\n\n".join(partials)})
+
+
+PIPELINES: dict[str, Callable[[StageTimer, argparse.Namespace], None]] = {
+    "rag_demo": rag_demo,
+    "medical_rag": medical_rag,
+    "structured_chain": structured_chain,
+    "summarize": summarize,
+}
+
+
+# --- 3. RUNNING AND COMPARING ---
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "latency_scale": args.latency_scale,
+        },
+        "pipelines": {},
+    }
+    for name in args.pipelines:
+        timer = StageTimer()
+        for _ in range(args.repeat):
+            with timer.stage("total"):
+                PIPELINES[name](timer, args)
+        results["pipelines"][name] = timer.summary()
+    return results
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Print median deltas per stage and return the stages that regressed."""
+    regressions = []
+    print(f"{'pipeline/stage':<34}{'baseline':>12}{'current':>12}{'delta':>9}")
+    for pipeline, stages in current["pipelines"].items():
+        for stage, stats in stages.items():
+            base = baseline.get("pipelines", {}).get(pipeline, {}).get(stage)
+            if not base:
+                continue
+            before, after = base["median_ms"], stats["median_ms"]
+            delta = (after - before) / before if before else 0.0
+            # Ignore sub-millisecond noise on trivially cheap stages.
+            flag = delta > threshold and after - before > 1.0
+            if flag:
+                regressions.append(f"{pipeline}/{stage}")
+            print(f"{pipeline + '/' + stage:<34}{before:>10.2f}ms{after:>10.2f}ms{delta:>+8.1%}{'  <-- regression' if flag else ''}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with fake models.")
+    parser.add_argument("--pipelines", nargs="+", choices=sorted(PIPELINES), default=list(PIPELINES))
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per pipeline")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake latency distributions")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply all fake latencies (0 = none)")
+    parser.add_argument("--output", "-o", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative median slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any stage regressed")
+    args = parser.parse_args()
+
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"Regressed: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
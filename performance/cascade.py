@@ -0,0 +1,171 @@
+"""Fast-model-first cascade that escalates to a smarter model only on failure.
+
+Most prompts are answered well enough by the small model. The cascade sends
+the input to `fast` first, runs a list of validators on the answer and only
+re-sends the input to `smart` when one of them fails (or the fast model
+raises). Escalation counts are kept per cascade and prompt in `cascade_stats`:
+the prompt is named by `metadata={"prompt": ...}` in the call's config, or else
+identified by a short hash of the prompt's first message (usually the fixed
+system prompt).
+
+A validator is any callable `(input, output) -> bool`. Helpers below cover the
+usual checks: output parses, output is long enough, and two samples agree.
+
+Usage:
+    from performance.cascade import ModelCascade, min_length
+
+    answer_step = ModelCascade(fast_model, smart_model, [min_length(200)], name="explain")
+    chain = prompt | answer_step | StrOutputParser()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Callable, Sequence
+
+from langchain_core.callbacks import CallbackManagerForChainRun
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import patch_config
+
+Validator = Callable[[Any, Any], bool]
+
+
+def _text(output: Any) -> str:
+    return output if isinstance(output, str) else str(getattr(output, "content", output))
+
+
+# --- 1. VALIDATORS ---
+
+def min_length(chars: int) -> Validator:
+    """Fail answers shorter than `chars` characters (after stripping)."""
+    def check(_input: Any, output: Any) -> bool:
+        return len(_text(output).strip()) >= chars
+    check.__name__ = f"min_length({chars})"
+    return check
+
+
+def parses_with(parser: Runnable) -> Validator:
+    """Fail answers that `parser` cannot parse (e.g. a PydanticOutputParser)."""
+    def check(_input: Any, output: Any) -> bool:
+        try:
+            parser.invoke(output)
+        except Exception:  # noqa: BLE001 - any parser error means "not usable"
+            return False
+        return True
+    check.__name__ = f"parses_with({type(parser).__name__})"
+    return check
+
+
+def self_consistent(sampler: Runnable, threshold: float = 0.8) -> Validator:
+    """Draw a second answer from `sampler` and fail if it disagrees.
+
+    Only meaningful when `sampler` has a non-zero temperature and is not
+    served from the LLM cache; otherwise both samples are identical.
+    """
+    def check(input: Any, output: Any) -> bool:
+        second = _text(sampler.invoke(input))
+        return SequenceMatcher(None, _text(output), second).ratio() >= threshold
+    check.__name__ = f"self_consistent({threshold})"
+    return check
+
+
+# --- 2. STATS ---
+
+@dataclass
+class EscalationStats:
+    calls: int = 0
+    escalations: int = 0
+    reasons: Counter = field(default_factory=Counter)
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "escalations": self.escalations,
+            "escalation_rate": round(self.escalation_rate, 4),
+            "reasons": dict(self.reasons),
+        }
+
+
+# "cascade name/prompt" -> stats, shared by every cascade in the process
+cascade_stats: dict[str, EscalationStats] = {}
+_stats_lock = threading.Lock()
+
+
+def prompt_key(input: Any, config: RunnableConfig) -> str:
+    """Name of the prompt behind `input`: config metadata, else a hash of its first message."""
+    name = (config.get("metadata") or {}).get("prompt")
+    if name:
+        return str(name)
+    if isinstance(input, PromptValue):
+        messages = input.to_messages()
+        first = _text(messages[0]) if messages else ""
+    elif isinstance(input, (list, tuple)) and input:
+        first = _text(input[0])
+    else:
+        first = _text(input)
+    return hashlib.sha256(first.encode("utf-8")).hexdigest()[:12]
+
+
+def escalation_report() -> str:
+    lines = [
+        f"{name}: {s.escalations}/{s.calls} escalated ({s.escalation_rate:.0%}) {dict(s.reasons)}"
+        for name, s in cascade_stats.items()
+    ]
+    return "\n".join(lines) or "no cascade calls recorded"
+
+
+# --- 3. THE RUNNABLE ---
+
+class ModelCascade(Runnable[Any, Any]):
+    """Runnable that tries `fast`, validates, and falls back to `smart`."""
+
+    def __init__(
+        self,
+        fast: Runnable,
+        smart: Runnable,
+        validators: Sequence[Validator] = (),
+        name: str = "cascade",
+    ):
+        self.fast = fast
+        self.smart = smart
+        self.validators = list(validators)
+        self.name = name
+
+    def _record(self, key: str, reason: str | None) -> None:
+        with _stats_lock:
+            stats = cascade_stats.setdefault(f"{self.name}/{key}", EscalationStats())
+            stats.calls += 1
+            if reason is not None:
+                stats.escalations += 1
+                stats.reasons[reason] += 1
+
+    def _cascade(
+        self,
+        input: Any,
+        run_manager: CallbackManagerForChainRun,
+        config: RunnableConfig,
+        **kwargs: Any,
+    ) -> Any:
+        child_config = patch_config(config, callbacks=run_manager.get_child())
+        try:
+            output = self.fast.invoke(input, child_config, **kwargs)
+            reason = next((v.__name__ for v in self.validators if not v(input, output)), None)
+        except Exception as exc:  # noqa: BLE001 - a failing fast model is an escalation
+            reason = type(exc).__name__
+
+        self._record(prompt_key(input, config), reason)
+        if reason is None:
+            return output
+        return self.smart.invoke(input, child_config, **kwargs)
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        return self._call_with_config(self._cascade, input, config, **kwargs)
@@ -0,0 +1,11 @@
+"""Shared settings for the performance helpers.
+
+Everything that persists between runs lives under CACHE_DIR. Point the
+LANG101_CACHE_DIR environment variable somewhere else to relocate it (for
+example a per-job directory in CI).
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("LANG101_CACHE_DIR", Path.home() / ".cache" / "lang-101"))
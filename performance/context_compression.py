@@ -0,0 +1,287 @@
+"""Shrink retrieved context before it goes into the RAG prompt.
+
+`{"context": retriever, ...} | prompt` formats the retrieved list with
+`str(list[Document])`, i.e. every chunk's repr with ids and metadata, and
+with chunk_overlap=50 neighbouring chunks repeat the same text. Prompt size
+is what drives prefill latency, so `ContextCompressor` sits between the
+retriever and the prompt and:
+
+1. merges chunks that overlap or touch in the source document (exactly via
+   `start_index` when the splitter was built with add_start_index=True,
+   otherwise by matching the end of one chunk to the start of the next),
+2. drops sentences that are near-duplicates of one already kept from the
+   same document / record (word-set Jaccard similarity),
+3. if the result is still over `token_budget`, keeps the sentences that score
+   best against the question (IDF-weighted word overlap, computed locally),
+   always together with their record's `[RECORD ID]` / `Patient Name` lines,
+4. joins what is left as plain text.
+
+Token counts are estimated (~4 characters per token) unless a counter is
+passed. Savings versus the raw formatting are collected in `stats`.
+
+Usage:
+    compressor = ContextCompressor(token_budget=300)
+    chain = {"context": retriever, "question": RunnablePassthrough()} | compressor | prompt | llm
+    print(compressor.stats.report())
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from langchain_core.documents import Document
+from langchain_core.runnables import Runnable, RunnableConfig
+
+# Lines that say whose facts follow; never trimmed away from their record
+_ANCHOR = re.compile(r"\[RECORD ID:|Patient Name:")
+# Sentence ends, blank lines, and line breaks before list items / "Key:" lines
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n\s*|\n(?=[ \t]*(?:[-*•]|[A-Z][\w ()/-]{0,30}:))")
+_WORD = re.compile(r"[a-z0-9]+")
+# Chunks only merge when they come from the same document (and the same record
+# for the medical notes, which are split per record before chunking)
+_SAME_DOCUMENT_KEYS = ("source", "record_id")
+_STOPWORDS = frozenset(
+    "a an and are as at be by does did do for from has have how i in is it its of on or "
+    "that the their this to was what when where which who why will with".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+# --- 1. MERGING ---
+
+def _join_overlap(a: str, b: str, min_overlap: int, max_overlap: int) -> str | None:
+    """a + b without the repeated part, if b continues a (or contains it)."""
+    if b in a:
+        return a
+    if a in b:
+        return b
+    for size in range(min(len(a), len(b), max_overlap), min_overlap - 1, -1):
+        # Require real words, so two chunks that merely share a "-----" rule don't merge
+        if a.endswith(b[:size]) and len(_WORD.findall(b[:size].lower())) >= 3:
+            return a + b[size:]
+    return None
+
+
+def _merge_pair(a: Document, b: Document, min_overlap: int, max_overlap: int) -> Document | None:
+    if any(a.metadata.get(key) != b.metadata.get(key) for key in _SAME_DOCUMENT_KEYS):
+        return None
+    start_a, start_b = a.metadata.get("start_index"), b.metadata.get("start_index")
+    if start_a is not None and start_b is not None:
+        if start_b < start_a:
+            a, b, start_a, start_b = b, a, start_b, start_a
+        end_a = start_a + len(a.page_content)
+        if start_b > end_a + 2:  # adjacent chunks are only split by a stripped "\n\n"
+            return None
+        tail = b.page_content[end_a - start_b:] if start_b <= end_a else "\n\n" + b.page_content
+        return Document(page_content=a.page_content + tail, metadata=a.metadata)
+    text = _join_overlap(a.page_content, b.page_content, min_overlap, max_overlap)
+    if text is None:
+        text = _join_overlap(b.page_content, a.page_content, min_overlap, max_overlap)
+        a = b if text is not None else a
+    return None if text is None else Document(page_content=text, metadata=a.metadata)
+
+
+def merge_chunks(docs: list[Document], min_overlap: int = 20, max_overlap: int = 200) -> list[Document]:
+    """Merge overlapping/adjacent chunks; output keeps the best retrieval rank."""
+    merged = list(docs)
+    # A chunk can bridge two others, so keep merging pairs until nothing changes.
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                joined = _merge_pair(merged[i], merged[j], min_overlap, max_overlap)
+                if joined is not None:
+                    merged[i] = joined  # the merged chunk takes the better rank
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+# --- 2. SENTENCES ---
+
+@dataclass
+class _Sentence:
+    chunk: int
+    group: tuple  # _SAME_DOCUMENT_KEYS values of the chunk it came from
+    text: str  # includes its trailing separator, so kept text rejoins cleanly
+    words: set[str]
+    score: float = 0.0
+
+    @property
+    def is_anchor(self) -> bool:
+        return bool(_ANCHOR.search(self.text))
+
+
+def _sentences(docs: list[Document]) -> list[_Sentence]:
+    out = []
+    for rank, doc in enumerate(docs):
+        group = tuple(doc.metadata.get(key) for key in _SAME_DOCUMENT_KEYS)
+        text, start = doc.page_content, 0
+        for match in _BOUNDARY.finditer(text):
+            out.append(_Sentence(rank, group, text[start:match.end()], _words(text[start:match.start()])))
+            start = match.end()
+        if start < len(text):
+            out.append(_Sentence(rank, group, text[start:], _words(text[start:])))
+    return [s for s in out if s.text.strip()]
+
+
+def _is_duplicate(words: set[str], kept: list[set[str]], threshold: float) -> bool:
+    if not words:
+        return False
+    for other in kept:
+        if len(words & other) / len(words | other) >= threshold:
+            return True
+    return False
+
+
+def _score(sentences: list[_Sentence], question: str) -> None:
+    query = _words(question) - _STOPWORDS
+    n = len(sentences)
+    df: dict[str, int] = {}
+    for s in sentences:
+        for w in s.words & query:
+            df[w] = df.get(w, 0) + 1
+    for s in sentences:
+        overlap = sum(math.log(1 + n / df[w]) for w in s.words & query)
+        s.score = overlap + 0.1 / (s.chunk + 1)  # tie-break on retrieval rank
+
+
+# --- 3. COMPRESSION ---
+
+@dataclass
+class CompressionStats:
+    calls: int = 0
+    raw_tokens: int = 0  # what str(list[Document]) would have put in the prompt
+    compressed_tokens: int = 0
+    chunks_in: int = 0
+    chunks_out: int = 0
+    sentences_dropped: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.raw_tokens - self.compressed_tokens
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.saved_tokens / self.raw_tokens if self.raw_tokens else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "raw_tokens": self.raw_tokens,
+            "compressed_tokens": self.compressed_tokens,
+            "saved_ratio": round(self.saved_ratio, 4),
+            "chunks_in": self.chunks_in,
+            "chunks_out": self.chunks_out,
+            "sentences_dropped": self.sentences_dropped,
+        }
+
+    def report(self) -> str:
+        return (
+            f"Context compression: {self.raw_tokens} -> {self.compressed_tokens} prompt tokens "
+            f"({self.saved_ratio:.0%} saved over {self.calls} calls; "
+            f"chunks {self.chunks_in} -> {self.chunks_out}, {self.sentences_dropped} sentences dropped)"
+        )
+
+
+def compress_documents(
+    docs: list[Document],
+    question: str,
+    token_budget: int | None = None,
+    similarity: float = 0.85,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> tuple[str, dict[str, int]]:
+    """Return the compressed context string and per-call numbers."""
+    merged = merge_chunks(docs)
+    sentences = _sentences(merged)
+
+    # Only dedupe within one document/record: the same sentence in two patient
+    # records is two facts, not a repeat.
+    kept: list[_Sentence] = []
+    seen: dict[tuple, list[set[str]]] = {}
+    for s in sentences:
+        group_seen = seen.setdefault(s.group, [])
+        if not _is_duplicate(s.words, group_seen, similarity):
+            kept.append(s)
+            group_seen.append(s.words)
+
+    if token_budget is not None and count_tokens("".join(s.text for s in kept)) > token_budget:
+        _score(kept, question)
+        anchors: dict[int, list[int]] = {}
+        for i, s in enumerate(kept):
+            if s.is_anchor:
+                anchors.setdefault(s.chunk, []).append(i)
+        chosen, used = set(), 0
+        for i in sorted(range(len(kept)), key=lambda i: -kept[i].score):
+            # A fact is only kept together with the lines saying whose it is
+            group = {i, *anchors.get(kept[i].chunk, ())} - chosen
+            cost = sum(count_tokens(kept[j].text) for j in group)
+            if chosen and used + cost > token_budget:
+                continue
+            chosen |= group
+            used += cost
+        kept = [s for i, s in enumerate(kept) if i in chosen]
+
+    by_chunk: dict[int, list[str]] = {}
+    for s in kept:
+        by_chunk.setdefault(s.chunk, []).append(s.text)
+    context = "\n\n".join("".join(parts).strip() for _, parts in sorted(by_chunk.items()))
+    return context, {
+        "raw_tokens": count_tokens(str(docs)),
+        "compressed_tokens": count_tokens(context),
+        "chunks_in": len(docs),
+        "chunks_out": len(by_chunk),
+        "sentences_dropped": len(sentences) - len(kept),
+    }
+
+
+class ContextCompressor(Runnable[dict, dict]):
+    """Maps {"context": list[Document], "question": str} to the same dict with
+    `context` replaced by a compressed string."""
+
+    def __init__(
+        self,
+        token_budget: int | None = None,
+        similarity: float = 0.85,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        context_key: str = "context",
+        question_key: str = "question",
+        name: str = "ContextCompressor",
+    ):
+        self.token_budget = token_budget
+        self.similarity = similarity
+        self.count_tokens = count_tokens
+        self.context_key = context_key
+        self.question_key = question_key
+        self.name = name
+        self.stats = CompressionStats()
+        self._lock = threading.Lock()
+
+    def _compress(self, inputs: dict) -> dict:
+        context, numbers = compress_documents(
+            inputs[self.context_key], inputs[self.question_key],
+            self.token_budget, self.similarity, self.count_tokens,
+        )
+        with self._lock:
+            self.stats.calls += 1
+            for key, value in numbers.items():
+                setattr(self.stats, key, getattr(self.stats, key) + value)
+        return {**inputs, self.context_key: context}
+
+    def invoke(self, input: dict, config: RunnableConfig | None = None, **kwargs: Any) -> dict:
+        return self._call_with_config(self._compress, input, config)
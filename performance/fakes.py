@@ -0,0 +1,212 @@
+"""Deterministic fake chat model and embedder for offline runs.
+
+Both behave like the real Ollama classes from a chain's point of view but
+never touch the network. Latency is drawn from a seeded distribution, so two
+runs with the same seed sleep for exactly the same amounts, and the chat
+model "generates" at a fixed token rate.
+
+Set `latency_scale=0` to measure pure framework overhead.
+
+Usage:
+    from performance.fakes import FakeChatModel, FakeEmbeddings
+
+    llm = FakeChatModel(latency_ms=300, tokens_per_second=40)
+    embeddings = FakeEmbeddings(size=1024, latency_ms=15)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, Callable, Iterator, Literal
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+Distribution = Literal["constant", "normal", "lognormal", "uniform"]
+
+_VOCAB = (
+    "the model retrieves relevant context and answers the question using "
+    "patients records notes summary chain prompt token latency result data"
+).split()
+
+
+def sample_latency(rng: random.Random, mean_ms: float, jitter_ms: float, distribution: Distribution) -> float:
+    """Draw one latency in seconds (never negative)."""
+    if distribution == "constant" or jitter_ms <= 0:
+        ms = mean_ms
+    elif distribution == "normal":
+        ms = rng.gauss(mean_ms, jitter_ms)
+    elif distribution == "uniform":
+        ms = rng.uniform(mean_ms - jitter_ms, mean_ms + jitter_ms)
+    elif distribution == "lognormal":
+        # Parameterised so the *median* is mean_ms; jitter widens the tail.
+        sigma = jitter_ms / mean_ms if mean_ms else 0.0
+        ms = mean_ms * rng.lognormvariate(0.0, sigma)
+    else:
+        raise ValueError(f"Unknown latency distribution: {distribution!r}")
+    return max(0.0, ms) / 1000
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+
+# --- 1. CHAT MODEL ---
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with configurable latency and token rate.
+
+    The reply is derived from a hash of the prompt, so the same prompt always
+    gets the same answer. Pass `responder` to control the text (for example to
+    return JSON that a PydanticOutputParser accepts).
+    """
+
+    model: str = "fake-chat"
+    temperature: float = 0.0
+    latency_ms: float = 200.0  # time to first token
+    jitter_ms: float = 50.0
+    distribution: Distribution = "lognormal"
+    tokens_per_second: float = 50.0
+    response_tokens: int = 40
+    latency_scale: float = 1.0
+    seed: int = 0
+    responder: Callable[[list[BaseMessage]], str] | None = None
+
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _reply(self, messages: list[BaseMessage]) -> str:
+        if self.responder is not None:
+            return self.responder(messages)
+        prompt = "\n".join(str(m.content) for m in messages)
+        rng = random.Random(_digest(prompt))
+        return " ".join(rng.choice(_VOCAB) for _ in range(self.response_tokens))
+
+    def _first_token_delay(self) -> float:
+        return sample_latency(self._rng, self.latency_ms, self.jitter_ms, self.distribution) * self.latency_scale
+
+    def _per_token_delay(self) -> float:
+        return self.latency_scale / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _usage(self, messages: list[BaseMessage], text: str) -> dict[str, int]:
+        # Whitespace tokens are a fine stand-in for real tokenizer counts here.
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        output_tokens = len(text.split())
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self._reply(messages)
+        time.sleep(self._first_token_delay() + len(text.split()) * self._per_token_delay())
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Waits without holding a thread, like a real HTTP backend
+        text = self._reply(messages)
+        await asyncio.sleep(self._first_token_delay() + len(text.split()) * self._per_token_delay())
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        text = self._reply(messages)
+        time.sleep(self._first_token_delay())
+        per_token = self._per_token_delay()
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def json_responder(payload: dict[str, Any]) -> Callable[[list[BaseMessage]], str]:
+    """Responder that always returns `payload` as JSON (for structured chains)."""
+    text = json.dumps(payload)
+    return lambda _messages: text
+
+
+# --- 2. EMBEDDINGS ---
+
+class FakeEmbeddings(Embeddings):
+    """Hash-seeded unit vectors with per-call and per-text latency."""
+
+    def __init__(
+        self,
+        size: int = 1024,
+        latency_ms: float = 20.0,
+        per_text_ms: float = 2.0,
+        jitter_ms: float = 5.0,
+        distribution: Distribution = "normal",
+        latency_scale: float = 1.0,
+        seed: int = 0,
+    ):
+        self.model = f"fake-embed-{size}"
+        self.size = size
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.latency_scale = latency_scale
+        self._rng = random.Random(seed)
+
+    def _vector(self, text: str) -> list[float]:
+        vec = np.random.default_rng(_digest(text)).standard_normal(self.size)
+        return (vec / np.linalg.norm(vec)).tolist()
+
+    def _delay(self, n_texts: int) -> float:
+        delay = sample_latency(self._rng, self.latency_ms, self.jitter_ms, self.distribution)
+        return (delay + n_texts * self.per_text_ms / 1000) * self.latency_scale
+
+    def _sleep(self, n_texts: int) -> None:
+        time.sleep(self._delay(n_texts))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self._sleep(len(texts))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self._sleep(1)
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self._delay(len(texts)))
+        return [self._vector(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self._delay(1))
+        return self._vector(text)
@@ -0,0 +1,311 @@
+"""Two-tier response cache for deterministic chat model calls.
+
+Our chain scripts send the same prompts at temperature 0-0.2 on every run.
+This module plugs into LangChain's global LLM cache hook, so a single
+`install_llm_cache()` call makes every chat model in the process use it:
+
+- tier 1: in-memory LRU (fast, per process)
+- tier 2: SQLite file with a TTL (shared across runs and processes)
+
+Entries are keyed by (model, temperature, format, fully rendered messages);
+ChatOllama leaves the model settings out of its cache key, so the installer
+adds them for that class only.
+Hit rate and the model latency we avoided are tracked in `cache.stats`.
+
+Usage:
+    from performance.llm_cache import install_llm_cache
+
+    cache = install_llm_cache()          # once, before invoking any chain
+    ...
+    print(cache.stats.report())
+
+Set LANG101_LLM_CACHE=off to disable the cache without touching code.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps, loads
+from pydantic import BaseModel
+
+from performance.config import CACHE_DIR
+
+DEFAULT_DB_PATH = CACHE_DIR / "llm_cache.sqlite3"
+
+# Attributes of non-Pydantic models (e.g. our fakes) that change the response.
+_KEY_ATTRIBUTES = ("model", "model_name", "temperature", "format", "top_p", "top_k", "seed", "num_predict")
+# Pydantic fields that are plumbing (callbacks, caching, HTTP client setup)
+# rather than settings that change what the model answers
+_RUNTIME_FIELDS = (frozenset(BaseChatModel.model_fields) - {"output_version"}) | {"keep_alive", "validate_model_on_init"}
+_MODEL_MARKER = "|model="
+# Matches both the JSON of serializable models and the repr of invocation params
+_TEMPERATURE_RE = re.compile(r"""["']temperature["'](?::|,) ([0-9.eE+-]+)""")
+
+
+# --- 1. KEYING ---
+
+def model_fingerprint(model: Any) -> str:
+    """Serialize the model settings that affect its output.
+
+    Pydantic models (ChatOllama, OllamaEmbeddings, ...) contribute every
+    field except runtime plumbing, so settings such as base_url, num_ctx or
+    stop are part of the key without listing them here.
+    """
+    if isinstance(model, BaseModel):
+        fields = {
+            name: value
+            for name, value in model.model_dump(exclude=set(_RUNTIME_FIELDS)).items()
+            if value is not None and "client" not in name
+        }
+    else:
+        fields = {name: getattr(model, name) for name in _KEY_ATTRIBUTES if getattr(model, name, None) is not None}
+    return json.dumps(fields, sort_keys=True, default=str)
+
+
+def _get_llm_string_with_model(self: BaseChatModel, stop: list[str] | None = None, **kwargs: Any) -> str:
+    # ChatOllama is not LangChain-serializable, so the stock llm_string is just
+    # "[('_type', 'chat-ollama'), ('stop', None)]" and would make every Ollama
+    # model share cache entries. Append the settings that actually matter.
+    return BaseChatModel._get_llm_string(self, stop=stop, **kwargs) + _MODEL_MARKER + model_fingerprint(self)
+
+
+def _ollama_chat_class() -> type | None:
+    try:
+        from langchain_ollama import ChatOllama
+    except ImportError:  # pragma: no cover - only the Gemini scripts installed
+        return None
+    return ChatOllama
+
+
+def _cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def _tagged(generations: RETURN_VAL_TYPE, tier: str) -> RETURN_VAL_TYPE:
+    # Mark where the answer came from; tracing callbacks read this from
+    # generation_info to report cache hits per span.
+    return [
+        g.model_copy(update={"generation_info": {**(g.generation_info or {}), "cache_hit": tier}})
+        for g in generations
+    ]
+
+
+def _temperature(llm_string: str) -> float | None:
+    # Prefer our fingerprint (ChatOllama); other models carry their own settings
+    _, marker, fingerprint = llm_string.partition(_MODEL_MARKER)
+    match = _TEMPERATURE_RE.search(fingerprint if marker else llm_string)
+    return float(match.group(1)) if match else None
+
+
+# --- 2. METRICS ---
+
+@dataclass
+class CacheStats:
+    lookups: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    skipped: int = 0  # calls above max_temperature, never cached
+    saved_seconds: float = 0.0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hit_rate, 4),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+    def report(self) -> str:
+        return (
+            f"LLM cache: {self.hits}/{self.lookups} hits ({self.hit_rate:.0%}; "
+            f"memory={self.memory_hits}, disk={self.disk_hits}), "
+            f"~{self.saved_seconds:.2f}s of model latency saved"
+        )
+
+
+# --- 3. THE CACHE ---
+
+class TieredLLMCache(BaseCache):
+    """In-memory LRU in front of an optional SQLite store with TTL."""
+
+    def __init__(
+        self,
+        db_path: Path | str | None = DEFAULT_DB_PATH,
+        max_memory_entries: int = 1024,
+        ttl_seconds: float | None = 7 * 24 * 3600,
+        max_temperature: float | None = 0.2,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self.stats = CacheStats()
+
+        # value: (generations, latency of the original call in seconds)
+        self._memory: OrderedDict[str, tuple[RETURN_VAL_TYPE, float]] = OrderedDict()
+        # key -> start times of the misses still waiting for update(), oldest first;
+        # identical prompts can be in flight at the same time
+        self._pending: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+        self._db: sqlite3.Connection | None = None
+        if db_path is not None:
+            db_path = Path(db_path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " latency REAL NOT NULL, expires_at REAL)"
+            )
+            self._db.commit()
+
+    def _cacheable(self, llm_string: str) -> bool:
+        if self.max_temperature is None:
+            return True
+        # No explicit temperature means the provider default (0.8 for Ollama),
+        # which is not deterministic enough to replay.
+        temperature = _temperature(llm_string)
+        return temperature is not None and temperature <= self.max_temperature
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE, latency: float) -> None:
+        self._memory[key] = (value, latency)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        if not self._cacheable(llm_string):
+            with self._lock:
+                self.stats.skipped += 1
+            return None
+
+        key = _cache_key(prompt, llm_string)
+        with self._lock:
+            self.stats.lookups += 1
+
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                self.stats.saved_seconds += entry[1]
+                return _tagged(entry[0], "memory")
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, latency, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, latency, expires_at = row
+                    if expires_at is None or expires_at > time.time():
+                        with suppress_langchain_beta_warning():
+                            generations = loads(value)
+                        self._remember(key, generations, latency)
+                        self.stats.disk_hits += 1
+                        self.stats.saved_seconds += latency
+                        return _tagged(generations, "disk")
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.stats.misses += 1
+            self._pending.setdefault(key, deque(maxlen=64)).append(time.perf_counter())
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not self._cacheable(llm_string):
+            return
+        key = _cache_key(prompt, llm_string)
+        with self._lock:
+            waiting = self._pending.get(key)
+            started = waiting.popleft() if waiting else None
+            if not waiting:
+                self._pending.pop(key, None)
+            latency = time.perf_counter() - started if started is not None else 0.0
+            self._remember(key, return_val, latency)
+            if self._db is not None:
+                expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, latency, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, dumps(list(return_val)), latency, expires_at),
+                )
+                self._db.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired disk entries and return how many were removed."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+
+# --- 4. INSTALLATION ---
+
+def install_llm_cache(cache: BaseCache | None = None, report_at_exit: bool = True, **kwargs: Any) -> BaseCache | None:
+    """Install `cache` (default: a new TieredLLMCache) as the global LLM cache.
+
+    Safe to call more than once: an already installed TieredLLMCache is reused.
+    Extra keyword arguments are passed to TieredLLMCache.
+    """
+    if os.environ.get("LANG101_LLM_CACHE", "").lower() in ("0", "off", "false"):
+        return None
+
+    ollama = _ollama_chat_class()
+    if ollama is not None:
+        ollama._get_llm_string = _get_llm_string_with_model
+
+    current = get_llm_cache()
+    if cache is None and isinstance(current, TieredLLMCache):
+        return current
+
+    cache = cache or TieredLLMCache(**kwargs)
+    set_llm_cache(cache)
+    if report_at_exit and isinstance(cache, TieredLLMCache):
+        atexit.register(lambda: cache.stats.lookups and print(cache.stats.report()))
+    return cache
+
+
+def uninstall_llm_cache() -> None:
+    """Remove the global cache and restore ChatOllama's own llm_string."""
+    set_llm_cache(None)
+    ollama = _ollama_chat_class()
+    if ollama is not None and "_get_llm_string" in vars(ollama):
+        del ollama._get_llm_string
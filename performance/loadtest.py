@@ -0,0 +1,184 @@
+"""HTTP load test for Basic_RAG/rag_server.py.
+
+Opens `--connections` keep-alive connections and has each one send
+questions back to back (closed loop) until `--requests` have been sent or
+`--duration` seconds have passed, then reports throughput and latency
+percentiles.
+
+With --spawn it starts the server itself on the fake backends from
+performance/fakes.py (index built from Basic_RAG/rag.txt), so the numbers
+measure our serving path rather than a model:
+
+    python -m performance.loadtest --spawn --workers 4 --connections 200 --requests 5000
+    python -m performance.loadtest --url http://127.0.0.1:8000 --duration 30 -o load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from performance.benchmark import DATA_DIR, MEDICAL_QUERIES, RAG_QUERIES
+
+SERVER = DATA_DIR / "rag_server.py"
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# --- 1. CLIENT ---
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, body: bytes) -> int:
+    writer.write(
+        f"POST /query HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def _connection(url, questions, counter, limit, deadline, latencies, errors) -> None:
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    try:
+        while next(counter) < limit and time.perf_counter() < deadline:
+            body = json.dumps({"question": next(questions)}).encode()
+            start = time.perf_counter()
+            try:
+                status = await _request(reader, writer, url.netloc, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors["connection"] = errors.get("connection", 0) + 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(url.hostname, url.port)
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(args: argparse.Namespace) -> dict[str, Any]:
+    url = urlsplit(args.url)
+    questions = itertools.cycle(RAG_QUERIES + MEDICAL_QUERIES)
+    counter = itertools.count()
+    limit = args.requests if args.requests else float("inf")
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else float("inf")
+    await asyncio.gather(*(
+        _connection(url, questions, counter, limit, deadline, latencies, errors)
+        for _ in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    ms = sorted(v * 1000 for v in latencies)
+    return {
+        "connections": args.connections,
+        "requests": len(ms) + sum(errors.values()),
+        "ok": len(ms),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "qps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ms, 0.50), 2),
+            "p90": round(percentile(ms, 0.90), 2),
+            "p99": round(percentile(ms, 0.99), 2),
+            "p999": round(percentile(ms, 0.999), 2),
+            "max": round(ms[-1], 2) if ms else 0.0,
+        },
+    }
+
+
+# --- 2. OPTIONAL LOCAL SERVER ---
+
+def _wait_until_healthy(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url + "/health", timeout=1):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise TimeoutError(f"server at {url} did not become healthy in {timeout}s")
+
+
+def spawn_server(args: argparse.Namespace, index_dir: str) -> subprocess.Popen:
+    url = urlsplit(args.url)
+    command = [
+        sys.executable, str(SERVER),
+        "--backend", "fake", "--latency-scale", str(args.latency_scale),
+        "--build", str(DATA_DIR / "rag.txt"), "--index", os.path.join(index_dir, "rag_index"),
+        "--host", url.hostname, "--port", str(url.port),
+        "--workers", str(args.workers), "--concurrency", str(args.concurrency),
+    ]
+    process = subprocess.Popen(command, cwd=DATA_DIR)
+    _wait_until_healthy(args.url, process)
+    return process
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure QPS and tail latency of rag_server.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--connections", type=int, default=100, help="Concurrent keep-alive clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (0 = until --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0 = no limit)")
+    parser.add_argument("--spawn", action="store_true", help="Start rag_server.py on fake backends first")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Server workers (with --spawn)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Per-worker concurrency (with --spawn)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Fake backend latency (with --spawn)")
+    parser.add_argument("--output", "-o", help="Also write the results as JSON here")
+    args = parser.parse_args()
+    if not args.requests and not args.duration:
+        parser.error("give --requests or --duration")
+
+    server = None
+    with tempfile.TemporaryDirectory() as index_dir:
+        try:
+            if args.spawn:
+                server = spawn_server(args, index_dir)
+            results = asyncio.run(run_load(args))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    latency = results["latency_ms"]
+    print(f"{results['ok']}/{results['requests']} ok in {results['seconds']}s over {results['connections']} connections")
+    print(f"QPS: {results['qps']}")
+    print(f"Latency ms: p50={latency['p50']} p90={latency['p90']} p99={latency['p99']} "
+          f"p99.9={latency['p999']} max={latency['max']}")
+    if results["errors"]:
+        print(f"Errors: {results['errors']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
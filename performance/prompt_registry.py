@@ -0,0 +1,201 @@
+"""Compile-once registry for prompt templates and parser format instructions.
+
+`parser.get_format_instructions()` renders the full Pydantic JSON schema every
+time it is called, and our chain scripts call it at import time for every
+parser. The registry:
+
+- keys each schema by a hash of the model's field definitions, config and
+  docstring, recursing into nested models and enums, so any change to fields,
+  constraints, defaults, config or nested models gets new instructions
+  (without generating the JSON schema, which costs as much as rendering),
+- keeps rendered instructions in memory and in a JSON file on disk, so the
+  schema is generated once per schema version instead of once per process,
+- hands prompts a *callable* partial, so neither the key nor the instructions
+  are computed until the prompt is actually formatted for the first time;
+  after that the callable returns the same string without any lookups.
+
+Usage:
+    from performance.prompt_registry import registry
+
+    prompt = registry.chat_prompt(
+        [("system", "You are a research assistant.\\n{format_instructions}"),
+         ("human", "Research the topic of {topic}")],
+        parser=parser,
+    )
+"""
+
+from __future__ import annotations
+
+import enum
+import functools
+import hashlib
+import json
+import re
+import threading
+import typing
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from pydantic import BaseModel
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from performance.config import CACHE_DIR
+
+DEFAULT_CACHE_PATH = CACHE_DIR / "format_instructions.json"
+# Object reprs of default factories, validators etc. differ between processes
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+@functools.lru_cache(maxsize=None)
+def _langchain_core_version() -> str:
+    # The instruction template text ships with langchain-core, so an upgrade
+    # must invalidate whatever we persisted with the old version.
+    try:
+        return version("langchain-core")
+    except PackageNotFoundError:  # pragma: no cover - editable/vendored installs
+        return "unknown"
+
+
+def _describe(annotation: Any, seen: set[type]) -> list[str]:
+    """Reprs of the models and enums reachable from a field annotation."""
+    parts = []
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        parts.append(_model_definition(annotation, seen))
+    elif isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        parts.append(repr([(m.name, m.value) for m in annotation]))
+    for arg in typing.get_args(annotation):
+        parts += _describe(arg, seen)
+    return parts
+
+
+def _model_definition(model: type[BaseModel], seen: set[type]) -> str:
+    if model in seen:  # self-referencing models
+        return model.__qualname__
+    seen.add(model)
+    parts = [model.__qualname__, model.__doc__ or "", repr(sorted(model.model_config.items(), key=str))]
+    for name, field in model.model_fields.items():
+        parts.append(f"{name}={field!r}")
+        parts += _describe(field.annotation, seen)
+    return _ADDRESS.sub("", "|".join(parts))
+
+
+@functools.lru_cache(maxsize=None)
+def _model_schema(model: type[BaseModel]) -> str:
+    # Everything the rendered JSON schema is built from (fields with their
+    # constraints and defaults, config, docstrings, nested models) without
+    # paying for model_json_schema(). Computed once per class.
+    return _model_definition(model, set())
+
+
+def schema_key(parser: Any) -> str:
+    """Return a stable hash identifying the schema behind `parser`."""
+    model = getattr(parser, "pydantic_object", None)
+    if model is None:
+        # Parsers without a schema (e.g. JSON parsers) are keyed by their type.
+        ident = f"{type(parser).__module__}.{type(parser).__qualname__}"
+    else:
+        ident = f"{model.__module__}.{model.__qualname__}|{_model_schema(model)}"
+    ident += f"|{type(parser).__qualname__}|{_langchain_core_version()}"
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+
+class PromptRegistry:
+    """Caches format instructions (memory + disk) and compiled chat prompts."""
+
+    def __init__(self, cache_path: Path | str | None = DEFAULT_CACHE_PATH):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._instructions: dict[str, str] | None = None  # loaded lazily
+        self._prompts: dict[tuple, ChatPromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    # --- DISK CACHE ---
+
+    def _load(self) -> dict[str, str]:
+        if self._instructions is None:
+            self._instructions = {}
+            if self.cache_path and self.cache_path.exists():
+                try:
+                    self._instructions = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    # A corrupt cache only costs us a re-render.
+                    self._instructions = {}
+        return self._instructions
+
+    def _persist(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._instructions, indent=1), encoding="utf-8")
+            tmp.replace(self.cache_path)
+        except OSError:
+            pass  # read-only home dir etc.: keep working from memory
+
+    # --- FORMAT INSTRUCTIONS ---
+
+    def format_instructions(self, parser: Any) -> str:
+        """Return `parser.get_format_instructions()`, rendering it at most once."""
+        key = schema_key(parser)
+        with self._lock:
+            cached = self._load().get(key)
+            if cached is not None:
+                return cached
+            rendered = parser.get_format_instructions()
+            self._instructions[key] = rendered
+            self._persist()
+            return rendered
+
+    def lazy_format_instructions(self, parser: Any) -> Callable[[], str]:
+        """Return a zero-arg callable suitable for `prompt.partial(...)`.
+
+        LangChain calls callable partials when the prompt is formatted, so the
+        schema is not touched at import time. The string is rendered (or read
+        from the cache) on the first call and reused after that.
+        """
+        rendered: str | None = None
+
+        def instructions() -> str:
+            nonlocal rendered
+            if rendered is None:
+                rendered = self.format_instructions(parser)
+            return rendered
+
+        return instructions
+
+    # --- PROMPTS ---
+
+    def chat_prompt(
+        self,
+        messages: Sequence[tuple[str, str]],
+        parser: Any = None,
+        variable: str = "format_instructions",
+    ) -> ChatPromptTemplate:
+        """Build (or reuse) a ChatPromptTemplate with lazy format instructions."""
+        # Keyed by the schema class, not schema_key(): building a prompt must stay free
+        key = (tuple(messages), type(parser), getattr(parser, "pydantic_object", None), variable)
+        prompt = self._prompts.get(key)
+        if prompt is None:
+            prompt = ChatPromptTemplate.from_messages(list(messages))
+            if parser is not None:
+                prompt = prompt.partial(**{variable: self.lazy_format_instructions(parser)})
+            self._prompts[key] = prompt
+        return prompt
+
+    def from_template(self, template: str, parser: Any = None, variable: str = "format_instructions"):
+        """Single human-message shortcut mirroring ChatPromptTemplate.from_template."""
+        return self.chat_prompt([("human", template)], parser=parser, variable=variable)
+
+    def clear(self) -> None:
+        """Drop both the in-memory and on-disk caches."""
+        with self._lock:
+            self._instructions = {}
+            self._prompts.clear()
+            if self.cache_path and self.cache_path.exists():
+                self.cache_path.unlink()
+
+
+# One shared registry per process; scripts import this instead of building their own.
+registry = PromptRegistry()
@@ -0,0 +1,463 @@
+"""Shared request scheduler for chat model calls.
+
+Every script creates its own ChatOllama / ChatGoogleGenerativeAI and calls it
+directly, so nothing stops a batch job from flooding a backend or from making
+an interactive user wait behind it. Wrapping the models with this scheduler
+adds:
+
+- a token bucket per backend (requests per second + burst),
+- retries of transient failures (connection errors, timeouts, 408/429/5xx)
+  with exponential backoff and full jitter,
+- two priority lanes: "interactive" is always dequeued before "batch", and
+  a job only takes a worker once its backend has a token, so a throttled
+  backend (or a job backing off before a retry) never holds up the others,
+- deadlines: requests still queued (or backing off) past their deadline are
+  failed with DeadlineExceeded instead of being sent, and a wrapped model's
+  caller stops waiting at the deadline even if the call itself hangs,
+- queue depth and wait time metrics per lane.
+
+It works with any Runnable, which makes it easy to exercise against a fake
+chat model (run this file: `python -m performance.scheduler`).
+
+Usage:
+    from performance.scheduler import get_scheduler
+
+    scheduler = get_scheduler(rate_limits={"chat-ollama": 2.0})
+    model = scheduler.wrap(ChatOllama(...), priority="interactive", timeout=30)
+    chain = prompt | model | StrOutputParser()
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+LANES = {"interactive": 0, "batch": 1}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request cannot be completed before its deadline."""
+
+
+TRANSIENT_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _status_code(exc: BaseException) -> int | None:
+    # httpx / requests style (.status_code or .response.status_code), google api_core (.code)
+    for candidate in (
+        getattr(exc, "status_code", None),
+        getattr(getattr(exc, "response", None), "status_code", None),
+        getattr(exc, "code", None),
+    ):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Worth retrying: network trouble, timeouts, throttling and 5xx responses.
+
+    Auth errors, bad requests and validation errors fail immediately.
+    """
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if type(exc).__module__.startswith("httpx") and type(exc).__name__ in {
+        "ConnectError", "ConnectTimeout", "ReadTimeout", "ReadError", "RemoteProtocolError", "PoolTimeout",
+    }:
+        return True
+    return _status_code(exc) in TRANSIENT_STATUS
+
+
+# --- 1. RATE LIMITING ---
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` saved."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        with self._lock:
+            self._refill()
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+# --- 2. METRICS ---
+
+@dataclass
+class LaneMetrics:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    expired: int = 0
+    retries: int = 0
+    depth: int = 0  # queued, including jobs waiting to retry
+    waits: deque = field(default_factory=lambda: deque(maxlen=1000))  # seconds spent queued
+
+    def as_dict(self) -> dict[str, Any]:
+        waits = sorted(self.waits)
+
+        def pct(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else 0.0
+
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "retries": self.retries,
+            "queue_depth": self.depth,
+            "wait_p50_s": pct(0.50),
+            "wait_p95_s": pct(0.95),
+            "wait_max_s": round(waits[-1], 4) if waits else 0.0,
+        }
+
+
+@dataclass
+class _Job:
+    fn: Callable[[], Any]
+    backend: str
+    lane: str
+    deadline: float | None
+    future: Future
+    seq: int
+    enqueued: float = field(default_factory=time.monotonic)
+    attempt: int = 0
+    queued: bool = True  # waiting in a backend queue or for its retry time
+
+    def order(self) -> tuple[int, int]:
+        return LANES[self.lane], self.seq
+
+
+# --- 3. THE SCHEDULER ---
+
+class ModelScheduler:
+    """Worker pool that dispatches model calls by priority under rate limits.
+
+    Jobs wait in one priority queue per backend. An idle worker takes the
+    highest-priority job among the backends that have a token right now, so
+    a rate-limited backend never holds a worker, and a failed attempt is put
+    back with a not-before time instead of sleeping in its worker.
+    """
+
+    def __init__(
+        self,
+        rate_limits: dict[str, float] | None = None,
+        workers: int = 4,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        retry_if: Callable[[BaseException], bool] = is_transient,
+    ):
+        self.buckets = {name: TokenBucket(rate) for name, rate in (rate_limits or {}).items()}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_if = retry_if
+        self.metrics = {lane: LaneMetrics() for lane in LANES}
+
+        self._queues: dict[str, list[tuple[tuple[int, int], _Job]]] = {}  # backend -> heap
+        self._delayed: list[tuple[float, int, _Job]] = []  # (not before, seq, job) heap of retries
+        self._deadlines: list[tuple[float, int, _Job]] = []  # heap of queued jobs with a deadline
+        self._seq = itertools.count()  # FIFO within a lane
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._running = 0
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"model-scheduler-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._workers:
+            thread.start()
+
+    # --- submission ---
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        backend: str = "default",
+        priority: str = "interactive",
+        timeout: float | None = None,
+    ) -> Future:
+        """Queue `fn` and return a Future with its result."""
+        if priority not in LANES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {list(LANES)}")
+        if self._closed:
+            raise RuntimeError("Scheduler has been shut down.")
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        job = _Job(fn=fn, backend=backend, lane=priority, deadline=deadline, future=Future(), seq=next(self._seq))
+        with self._ready:
+            lane = self.metrics[priority]
+            lane.submitted += 1
+            lane.depth += 1
+            heapq.heappush(self._queues.setdefault(backend, []), (job.order(), job))
+            if deadline is not None:
+                heapq.heappush(self._deadlines, (deadline, job.seq, job))
+            self._ready.notify()
+        return job.future
+
+    def add_rate_limits(self, rate_limits: dict[str, float]) -> None:
+        """Add limits for new backends; changing an existing limit is an error."""
+        with self._lock:
+            for name, rate in rate_limits.items():
+                bucket = self.buckets.get(name)
+                if bucket is None:
+                    self.buckets[name] = TokenBucket(rate)
+                elif bucket.rate != rate:
+                    raise ValueError(f"{name} is already limited to {bucket.rate}/s, not {rate}/s")
+
+    def wrap(self, model: Runnable, backend: str | None = None, priority: str = "interactive", timeout: float | None = None):
+        """Return a Runnable that routes `model.invoke` through the scheduler."""
+        return ScheduledRunnable(self, model, backend or backend_of(model), priority, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; workers exit once everything queued has run."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        if wait:
+            for thread in self._workers:
+                thread.join()
+
+    def metrics_snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {name: lane.as_dict() for name, lane in self.metrics.items()}
+
+    # --- dispatch (called with the lock held) ---
+
+    def _count(self, job: _Job, counter: str) -> None:
+        setattr(self.metrics[job.lane], counter, getattr(self.metrics[job.lane], counter) + 1)
+
+    def _dequeue(self, job: _Job) -> None:
+        job.queued = False
+        self.metrics[job.lane].depth -= 1
+
+    def _expire(self, now: float) -> None:
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, job = heapq.heappop(self._deadlines)
+            if job.queued:  # lazily removed from its backend queue / the retry heap
+                self._dequeue(job)
+                self._count(job, "expired")
+                job.future.set_exception(DeadlineExceeded(f"{job.backend} request missed its deadline"))
+
+    def _next_job(self) -> tuple[_Job | None, float | None]:
+        """Pop the best job whose backend has a token, or say how long to wait."""
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, job = heapq.heappop(self._delayed)
+            if job.queued:
+                heapq.heappush(self._queues[job.backend], (job.order(), job))
+        self._expire(now)
+
+        best, wait = None, None
+        for backend, heap in self._queues.items():
+            while heap and (not heap[0][1].queued or heap[0][1].future.cancelled()):
+                _, job = heapq.heappop(heap)
+                if job.queued:  # caller cancelled while queued
+                    self._dequeue(job)
+            if not heap:
+                continue
+            bucket = self.buckets.get(backend)
+            blocked = bucket.wait_time() if bucket else 0.0
+            if blocked:
+                wait = blocked if wait is None else min(wait, blocked)
+            elif best is None or heap[0][0] < best[0]:
+                best = heap[0]
+
+        if best is not None:
+            job = best[1]
+            bucket = self.buckets.get(job.backend)
+            if bucket is None or bucket.try_acquire():
+                heapq.heappop(self._queues[job.backend])
+                self._dequeue(job)
+                self.metrics[job.lane].waits.append(now - job.enqueued)
+                return job, None
+        for heap in (self._delayed, self._deadlines):
+            if heap:
+                wait = max(0.0, heap[0][0] - now) if wait is None else min(wait, max(0.0, heap[0][0] - now))
+        return None, wait
+
+    def _idle(self) -> bool:
+        return not self._running and not any(lane.depth for lane in self.metrics.values())
+
+    # --- execution ---
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads retries out so clients don't retry in lockstep.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _worker(self) -> None:
+        while True:
+            with self._ready:
+                while True:
+                    job, wait = self._next_job()
+                    if job is not None:
+                        break
+                    if self._closed and self._idle():
+                        self._ready.notify_all()
+                        return
+                    self._ready.wait(wait)
+                self._running += 1
+            if job.attempt or job.future.set_running_or_notify_cancel():
+                self._run(job)
+            with self._ready:
+                self._running -= 1
+                self._ready.notify_all()
+
+    def _run(self, job: _Job) -> None:
+        try:
+            result = job.fn()
+        except Exception as exc:  # noqa: BLE001 - retried or handed to the caller
+            delay = self._backoff(job.attempt)
+            out_of_time = job.deadline is not None and time.monotonic() + delay >= job.deadline
+            with self._ready:
+                if not self.retry_if(exc) or job.attempt == self.max_retries or out_of_time:
+                    self._count(job, "failed")
+                else:
+                    # Back in line once the delay is over; the worker moves on meanwhile
+                    self._count(job, "retries")
+                    job.attempt += 1
+                    job.queued = True
+                    job.enqueued = time.monotonic() + delay
+                    self.metrics[job.lane].depth += 1
+                    heapq.heappush(self._delayed, (job.enqueued, job.seq, job))
+                    return
+            job.future.set_exception(exc)
+        except BaseException as exc:  # noqa: BLE001 - hand it to the caller
+            with self._lock:
+                self._count(job, "failed")
+            job.future.set_exception(exc)
+        else:
+            with self._lock:
+                self._count(job, "completed")
+            job.future.set_result(result)
+
+
+def backend_of(model: Runnable) -> str:
+    """Best-effort backend name, e.g. 'chat-ollama' or 'chat-google-generative-ai'."""
+    try:
+        return model._llm_type  # type: ignore[attr-defined]
+    except Exception:  # noqa: BLE001
+        return type(model).__name__
+
+
+class ScheduledRunnable(Runnable[Any, Any]):
+    """Drop-in replacement for a chat model that goes through a ModelScheduler.
+
+    The lane can be overridden per call with `config={"metadata": {"priority": "batch"}}`.
+    """
+
+    def __init__(self, scheduler: ModelScheduler, model: Runnable, backend: str, priority: str, timeout: float | None):
+        self.scheduler = scheduler
+        self.model = model
+        self.backend = backend
+        self.priority = priority
+        self.timeout = timeout
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        priority = ((config or {}).get("metadata") or {}).get("priority", self.priority)
+        started = time.monotonic()
+        future = self.scheduler.submit(
+            lambda: self.model.invoke(input, config, **kwargs),
+            backend=self.backend,
+            priority=priority,
+            timeout=self.timeout,
+        )
+        if self.timeout is None:
+            return future.result()
+        try:
+            return future.result(timeout=max(0.0, self.timeout - (time.monotonic() - started)))
+        except FutureTimeout:
+            # A hung call keeps its worker thread, but the caller gets control back.
+            future.cancel()
+            raise DeadlineExceeded(f"{self.backend} call did not finish within {self.timeout}s") from None
+
+
+_shared: ModelScheduler | None = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler(**kwargs: Any) -> ModelScheduler:
+    """Return the process-wide scheduler, creating it with `kwargs` on first use.
+
+    Later calls may add `rate_limits` for new backends; any other setting (or
+    a different limit for a known backend) raises ValueError instead of being
+    silently ignored.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ModelScheduler(**kwargs)
+            return _shared
+        rate_limits = kwargs.pop("rate_limits", None)
+        if kwargs:
+            raise ValueError(f"The shared scheduler already exists; cannot change {sorted(kwargs)}")
+        if rate_limits:
+            _shared.add_rate_limits(rate_limits)
+        return _shared
+
+
+# --- 4. DEMO AGAINST A FAKE MODEL ---
+
+if __name__ == "__main__":
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    class SlowFakeChat(FakeListChatModel):
+        """Fake chat model with a fixed latency and an occasional transient error."""
+
+        latency: float = 0.05
+        error_rate: float = 0.1
+
+        def _call(self, *args: Any, **kwargs: Any) -> str:
+            time.sleep(self.latency)
+            if random.random() < self.error_rate:
+                raise ConnectionError("transient backend error")
+            return super()._call(*args, **kwargs)
+
+    scheduler = ModelScheduler(rate_limits={"chat-fake": 20.0}, workers=2, base_delay=0.05)
+    fake = SlowFakeChat(responses=["ok"])
+    batch_model = scheduler.wrap(fake, backend="chat-fake", priority="batch")
+    chat_model = scheduler.wrap(fake, backend="chat-fake", priority="interactive", timeout=2.0)
+
+    # Queue a large batch job, then fire interactive requests behind it.
+    batch_futures = [scheduler.submit(lambda: batch_model.model.invoke("hi"), "chat-fake", "batch") for _ in range(40)]
+    started = time.monotonic()
+    print("interactive answer:", chat_model.invoke("hello").content, f"in {time.monotonic() - started:.2f}s")
+    for f in batch_futures:
+        f.exception()
+
+    for lane, stats in scheduler.metrics_snapshot().items():
+        print(lane, stats)
+    scheduler.shutdown()
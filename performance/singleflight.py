@@ -0,0 +1,148 @@
+"""Request coalescing ("single flight") for chat models and embedders.
+
+When several callers ask for exactly the same thing at the same moment (many
+users of Basic_RAG/rag_server.py asking the same question, everyone right
+after a cache flush), only the first call goes to the backend. The others
+wait for it and receive the same result, or the same exception. Both sync
+(threads) and async (one event loop) callers are supported; async callers
+await a shared task and hold no thread.
+
+Nothing is kept once the call finishes: this is not a cache. Put it *behind*
+the response cache (performance.llm_cache) to absorb the thundering herd on
+a cold cache.
+
+Usage:
+    from performance.singleflight import CoalescingChatModel, CoalescingEmbeddings
+
+    llm = CoalescingChatModel(ChatOllama(...))
+    embeddings = CoalescingEmbeddings(OllamaEmbeddings(model="mxbai-embed-large"))
+    answer = await llm.ainvoke(messages)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.load import dumps
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from performance.llm_cache import model_fingerprint
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, Future] = {}
+        self._ainflight: dict[tuple[int, Hashable], asyncio.Future] = {}  # shared tasks, keyed per event loop
+        self._lock = threading.Lock()
+        self.calls = 0   # calls that reached the backend
+        self.shared = 0  # calls answered by someone else's in-flight request
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async `do`: the call runs as its own task that every caller awaits.
+
+        Cancelling a caller (leader or follower) only stops it waiting; the
+        shared call keeps running for the others.
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        task = self._ainflight.get(loop_key)
+        with self._lock:
+            if task is None:
+                self.calls += 1
+            else:
+                self.shared += 1
+        if task is None:
+            task = self._ainflight[loop_key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finish(loop_key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, loop_key: tuple[int, Hashable], task: asyncio.Future) -> None:
+        del self._ainflight[loop_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: every caller may have given up
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            in_flight = len(self._inflight) + len(self._ainflight)
+            return {"backend_calls": self.calls, "coalesced": self.shared, "in_flight": in_flight}
+
+
+class CoalescingChatModel(Runnable[Any, Any]):
+    """Wraps a chat model so identical concurrent invocations share one call.
+
+    The key is the model's settings plus the fully rendered messages, so two
+    different prompts never share a result. Note that followers get the very
+    same message object as the leader.
+    """
+
+    def __init__(self, model: Runnable, flight: SingleFlight | None = None):
+        self.model = model
+        self.flight = flight or SingleFlight()
+
+    def _key(self, input: Any, kwargs: dict[str, Any]) -> str:
+        messages = self.model._convert_input(input).to_messages()  # type: ignore[attr-defined]
+        return model_fingerprint(self.model) + dumps(messages) + repr(sorted(kwargs.items()))
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        return self.flight.do(self._key(input, kwargs), lambda: self.model.invoke(input, config, **kwargs))
+
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        return await self.flight.ado(self._key(input, kwargs), lambda: self.model.ainvoke(input, config, **kwargs))
+
+
+class CoalescingEmbeddings(Embeddings):
+    """Embeddings wrapper that coalesces identical concurrent requests."""
+
+    def __init__(self, embeddings: Embeddings, flight: SingleFlight | None = None):
+        self.embeddings = embeddings
+        self.flight = flight or SingleFlight()
+        self._id = model_fingerprint(embeddings) + type(embeddings).__name__
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.flight.do((self._id, "query", text), lambda: self.embeddings.embed_query(text))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.flight.do(
+            (self._id, "documents", tuple(texts)), lambda: self.embeddings.embed_documents(texts)
+        )
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.flight.ado((self._id, "query", text), lambda: self.embeddings.aembed_query(text))
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.flight.ado(
+            (self._id, "documents", tuple(texts)), lambda: self.embeddings.aembed_documents(texts)
+        )
@@ -0,0 +1,289 @@
+"""Per-step tracing and sampled profiling for Runnable pipelines.
+
+`SpanRecorder` is a LangChain callback handler that turns every chain, model,
+retriever, tool and parser step into a span with:
+
+- wall time (start/end in unix nanoseconds),
+- input and output size in bytes (JSON-serialized),
+- token counts and cache hits for model calls,
+- parent/child links, so nested steps form a tree per invocation.
+
+Spans are exported as OpenTelemetry OTLP/JSON (`resourceSpans` → `scopeSpans`
+→ `spans`), which Jaeger, Tempo and the OTel collector can import.
+`recorder.summary()` prints where the time went, step by step.
+
+Usage:
+    from performance.tracing import SpanRecorder, install_tracing
+
+    recorder = SpanRecorder()
+    chain.invoke(inputs, config={"callbacks": [recorder]})
+    print(recorder.summary())
+    recorder.export("trace.json")
+
+    # or, once per process, trace every chain without passing callbacks:
+    install_tracing("trace.json")
+
+For hot-path profiling wrap a runnable in `ProfiledRunnable`: a sampled
+fraction of calls run under cProfile and are dumped as .prof files (open them
+with `python -m pstats` or snakeviz). For py-spy, attach to the process
+instead: `py-spy record -o profile.svg --pid <pid>`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import cProfile
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.tracers.context import register_configure_hook
+
+from performance.config import CACHE_DIR
+
+_STATUS_OK, _STATUS_ERROR = 1, 2
+
+
+def _size(obj: Any) -> int:
+    try:
+        return len(json.dumps(obj, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(obj).encode("utf-8"))
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}  # OTLP/JSON encodes int64 as string
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# --- 1. THE RECORDER ---
+
+class SpanRecorder(BaseCallbackHandler):
+    """Callback handler that records one span per Runnable step."""
+
+    def __init__(self, sample_rate: float = 1.0, measure_sizes: bool = True, service_name: str = "lang-101"):
+        self.sample_rate = sample_rate
+        self.measure_sizes = measure_sizes
+        self.service_name = service_name
+        self.spans: list[dict[str, Any]] = []
+        self._open: dict[UUID, dict[str, Any]] = {}
+        self._trace_of: dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    # --- span bookkeeping ---
+
+    def _start(self, run_type: str, run_id: UUID, parent_run_id: UUID | None, name: str, inputs: Any) -> None:
+        with self._lock:
+            if parent_run_id is None:
+                # Sampling is decided once per top-level invocation.
+                if random.random() >= self.sample_rate:
+                    return
+                trace_id = run_id.hex
+            elif parent_run_id in self._trace_of:
+                trace_id = self._trace_of[parent_run_id]
+            else:
+                return  # parent was not sampled
+            self._trace_of[run_id] = trace_id
+            attributes = {"langchain.run_type": run_type}
+            if self.measure_sizes:
+                attributes["input.size_bytes"] = _size(inputs)
+            self._open[run_id] = {
+                "traceId": trace_id,
+                # run ids are UUIDv7: the tail is the random part
+                "spanId": run_id.hex[16:],
+                "parentSpanId": parent_run_id.hex[16:] if parent_run_id else "",
+                "name": name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": time.time_ns(),
+                "attributes": attributes,
+            }
+
+    def _end(self, run_id: UUID, outputs: Any = None, error: BaseException | None = None, **attributes: Any) -> None:
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            self._trace_of.pop(run_id, None)
+            if span is None:
+                return
+            span["endTimeUnixNano"] = time.time_ns()
+            if self.measure_sizes and outputs is not None:
+                span["attributes"]["output.size_bytes"] = _size(outputs)
+            span["attributes"].update({k: v for k, v in attributes.items() if v is not None})
+            if error is not None:
+                span["status"] = {"code": _STATUS_ERROR, "message": f"{type(error).__name__}: {error}"}
+            else:
+                span["status"] = {"code": _STATUS_OK}
+            self.spans.append(span)
+
+    @staticmethod
+    def _name(serialized: dict[str, Any] | None, kwargs: dict[str, Any], default: str) -> str:
+        return kwargs.get("name") or (serialized or {}).get("name") or default
+
+    # --- chains (includes prompts, parsers and lambdas) ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._start("chain", run_id, parent_run_id, self._name(serialized, kwargs, "chain"), inputs)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id, outputs)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    # --- models ---
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        inputs = [[(m.type, m.content) for m in batch] for batch in messages]
+        self._start("llm", run_id, parent_run_id, self._name(serialized, kwargs, "chat_model"), inputs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start("llm", run_id, parent_run_id, self._name(serialized, kwargs, "llm"), prompts)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        tokens = defaultdict(int)
+        cache_hit = None
+        for generation in (g for batch in response.generations for g in batch):
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            for key in ("input_tokens", "output_tokens", "total_tokens"):
+                tokens[key] += usage.get(key, 0)
+            cache_hit = (generation.generation_info or {}).get("cache_hit", cache_hit)
+        self._end(
+            run_id,
+            [[g.text for g in batch] for batch in response.generations],
+            **{f"llm.usage.{k}": v for k, v in tokens.items()},
+            **{"llm.cache_hit": cache_hit is not None, "llm.cache_tier": cache_hit},
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    # --- retrievers and tools ---
+
+    def on_retriever_start(self, serialized, query, *, run_id, parent_run_id=None, **kwargs):
+        self._start("retriever", run_id, parent_run_id, self._name(serialized, kwargs, "retriever"), query)
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        self._end(run_id, [d.page_content for d in documents], **{"retriever.documents": len(documents)})
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._start("tool", run_id, parent_run_id, self._name(serialized, kwargs, "tool"), input_str)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, output)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    # --- reporting ---
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Return the recorded spans as an OTLP/JSON `ExportTraceServiceRequest`."""
+        with self._lock:
+            spans = [
+                {**span, "attributes": [_attribute(k, v) for k, v in span["attributes"].items()],
+                 "startTimeUnixNano": str(span["startTimeUnixNano"]),
+                 "endTimeUnixNano": str(span["endTimeUnixNano"])}
+                for span in self.spans
+            ]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "performance.tracing"}, "spans": spans}],
+            }]
+        }
+
+    def export(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_otlp()), encoding="utf-8")
+        return path
+
+    def summary(self) -> str:
+        """Table of total/mean wall time per step name, slowest first."""
+        totals: dict[str, list[float]] = defaultdict(list)
+        with self._lock:
+            for span in self.spans:
+                totals[span["name"]].append((span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e6)
+        rows = sorted(totals.items(), key=lambda item: sum(item[1]), reverse=True)
+        lines = [f"{'step':<40}{'calls':>7}{'total ms':>12}{'mean ms':>10}"]
+        lines += [f"{name[:39]:<40}{len(ms):>7}{sum(ms):>12.2f}{sum(ms) / len(ms):>10.2f}" for name, ms in rows]
+        return "\n".join(lines)
+
+
+# --- 2. PROCESS-WIDE INSTALLATION ---
+
+_recorder_var: ContextVar[SpanRecorder | None] = ContextVar("lang101_span_recorder", default=None)
+_hook_registered = False
+
+
+def install_tracing(path: Path | str | None = None, sample_rate: float = 1.0, print_summary: bool = True) -> SpanRecorder:
+    """Attach a SpanRecorder to every Runnable invoked from this context.
+
+    Spans are exported to `path` (default: a timestamped file under the cache
+    dir) when the process exits.
+    """
+    global _hook_registered
+    if not _hook_registered:
+        register_configure_hook(_recorder_var, inheritable=True)
+        _hook_registered = True
+
+    recorder = SpanRecorder(sample_rate=sample_rate)
+    _recorder_var.set(recorder)
+    path = Path(path) if path else CACHE_DIR / "traces" / f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+    def _flush() -> None:
+        if recorder.spans:
+            recorder.export(path)
+            if print_summary:
+                print(recorder.summary())
+                print(f"Trace written to {path}")
+
+    atexit.register(_flush)
+    return recorder
+
+
+# --- 3. SAMPLED PROFILING ---
+
+class ProfiledRunnable(Runnable[Any, Any]):
+    """Runs a random `sample_rate` fraction of invocations under cProfile."""
+
+    def __init__(self, runnable: Runnable, sample_rate: float = 0.01, output_dir: Path | str | None = None):
+        self.runnable = runnable
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir) if output_dir else CACHE_DIR / "profiles"
+        self._count = 0
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        if random.random() >= self.sample_rate:
+            return self.runnable.invoke(input, config, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler (e.g. a nested or
+            # concurrent sampled call); run this one unprofiled.
+            return self.runnable.invoke(input, config, **kwargs)
+        try:
+            return self.runnable.invoke(input, config, **kwargs)
+        finally:
+            profiler.disable()
+            self._count += 1
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(self.output_dir / f"{self.runnable.get_name()}-{time.time_ns()}-{self._count}.prof")
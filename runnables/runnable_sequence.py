@@ -1,6 +1,10 @@
 import time
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough, RunnableSequence
 
+from performance.tracing import SpanRecorder
+from performance.fusion import fuse_lambdas
+from performance.batch_lambda import BatchParallel, batch_cleaner, batch_counter
+
 # ==========================================
 # PART 1: DEFINING SIMPLE "WORKERS"
 # ==========================================
@@ -94,4 +98,50 @@ rag_simulation = (
 query = "What is LangChain?"
 print(f"Querying: {query}")
 final_answer = rag_simulation.invoke(query)
-print(f"Output: {final_answer}")
\ No newline at end of file
+print(f"Output: {final_answer}")
+
+
+# ==========================================
+# PART 5: TRACING INSTEAD OF PRINT STATEMENTS
+# ==========================================
+print("\n--- EXPERIMENT 4: Timing Every Step With Callbacks ---")
+
+# A callback handler sees every step start and finish, so we get timings
+# without touching the step functions. Pass it through the config.
+recorder = SpanRecorder()
+rag_simulation.invoke(query, config={"callbacks": [recorder]})
+
+print(recorder.summary())
+# recorder.export("trace.json") writes OpenTelemetry JSON for Jaeger/Tempo
+
+
+# ==========================================
+# PART 6: FUSING CHEAP STEPS
+# ==========================================
+print("\n--- EXPERIMENT 5: Fusing Adjacent Lambdas ---")
+
+# cleaner | prefixer | counter pays the Runnable overhead three times.
+# fuse_lambdas turns them into one call; trace=False also skips callbacks.
+# (python -m performance.fusion measures the difference per invoke)
+fused_chain = fuse_lambdas(linear_chain, trace=False)
+print(f"FUSED RESULT: {fused_chain.invoke(input_data)}")
+
+
+# ==========================================
+# PART 7: VECTORIZED BATCHES
+# ==========================================
+print("\n--- EXPERIMENT 6: Batching Many Inputs At Once ---")
+
+# branching_chain.batch() runs cleaner and counter once per element.
+# The batch versions receive the whole list and do the work in NumPy.
+vectorized_branching_chain = (
+    batch_cleaner
+    | BatchParallel({
+        "original_data": RunnablePassthrough(),
+        "length_data": batch_counter,
+    })
+)
+
+records = ["   HELLO WORLD   ", "  LangChain  ", "RAG Pipelines "]
+for row in vectorized_branching_chain.batch(records):
+    print(f"  - {row}")
@@ -0,0 +1,39 @@
+from langchain_core.documents import Document
+
+from performance.context_compression import compress_documents
+
+
+def record(record_id: str, name: str, notes: str) -> Document:
+    text = f"[RECORD ID: {record_id}]\n    Patient Name: {name}\n    Age: 40\n    Notes: {notes}"
+    return Document(page_content=text, metadata={"source": "notes.txt", "record_id": record_id, "patient_name": name})
+
+
+def test_same_sentence_in_two_records_is_kept_in_both():
+    docs = [
+        record("001", "John Doe", "Fell off a ladder. Prescribed Ibuprofen 400mg for pain."),
+        record("005", "David Banor", "Fell off a bicycle. Prescribed Ibuprofen 400mg for pain."),
+    ]
+    context, numbers = compress_documents(docs, "Who got Ibuprofen?")
+    assert context.count("Prescribed Ibuprofen 400mg for pain.") == 2
+    assert numbers["sentences_dropped"] == 0
+
+
+def test_repeated_sentence_within_one_record_is_dropped():
+    doc = record("001", "John Doe", "Sprained ankle. Prescribed Ibuprofen 400mg for pain. Prescribed Ibuprofen 400mg for pain.")
+    context, numbers = compress_documents([doc], "What was prescribed?")
+    assert context.count("Prescribed Ibuprofen 400mg for pain.") == 1
+    assert numbers["sentences_dropped"] == 1
+
+
+def test_budget_trimming_keeps_the_record_header_with_its_facts():
+    docs = [
+        record("001", "John Doe", "BP 150/95. Reports headaches. Prescribed Lisinopril 10mg. Advised low sodium diet."),
+        record("003", "Michael Kamau", "High fever and chills. RDT positive for malaria. Prescribed Coartem for 3 days."),
+    ]
+    context, _ = compress_documents(docs, "Who was prescribed Coartem for malaria?", token_budget=40)
+    assert "Coartem" in context
+    assert "[RECORD ID: 003]" in context
+    assert "Patient Name: Michael Kamau" in context
+    # Facts of a record are never left without the lines saying whose they are
+    if "Lisinopril" in context:
+        assert "Patient Name: John Doe" in context
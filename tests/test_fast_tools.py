@@ -0,0 +1,51 @@
+import pytest
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, ConfigDict, Field
+
+from tools.fast_tools import FastTool
+
+
+def echo(text: str, times: int = 1) -> str:
+    return f"[{text}]x{times}"
+
+
+class Plain(BaseModel):
+    text: str
+    times: int = Field(default=1, ge=1)
+
+
+class Normalised(Plain):
+    model_config = ConfigDict(str_strip_whitespace=True, str_to_lower=True)
+
+
+class Aliased(BaseModel):
+    text: str = Field(alias="message")
+    times: int = 1
+
+
+CASES = [
+    (Plain, {"text": "  HI ", "times": "2"}),
+    (Plain, {"text": "hi", "extra": "ignored"}),
+    (Normalised, {"text": "  HI "}),
+]
+
+
+@pytest.mark.parametrize(("schema", "args"), CASES)
+def test_fast_path_matches_stock_invoke(schema, args):
+    tool = StructuredTool.from_function(echo, name="echo", description="Echo text.", args_schema=schema)
+    fast = FastTool(tool)
+    expected = tool.invoke(dict(args))
+    assert fast.invoke(dict(args)) == expected
+    assert fast.batch([dict(args)]) == [expected]
+
+
+@pytest.mark.parametrize(("schema", "args", "error"), [
+    (Plain, {"text": "hi", "times": 0}, ValueError),  # ValidationError
+    (Aliased, {"message": "hi"}, TypeError),  # BaseTool passes field names, not aliases
+])
+def test_invalid_arguments_fail_like_stock_invoke(schema, args, error):
+    tool = StructuredTool.from_function(echo, name="echo", description="Echo text.", args_schema=schema)
+    with pytest.raises(error):
+        tool.invoke(dict(args))
+    with pytest.raises(error):
+        FastTool(tool).invoke(dict(args))
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field
+
+from performance.prompt_registry import PromptRegistry, schema_key
+
+
+class Summary(BaseModel):
+    title: str = Field(description="Short title.")
+    points: list[str] = Field(description="Key points.")
+
+
+MESSAGES = [("system", "Summarise.\n{format_instructions}"), ("human", "{text}")]
+
+
+def test_building_a_prompt_generates_no_json_schema(tmp_path):
+    parser = PydanticOutputParser(pydantic_object=Summary)
+    registry = PromptRegistry(cache_path=tmp_path / "instructions.json")
+    with mock.patch.object(Summary, "model_json_schema", wraps=Summary.model_json_schema) as schema:
+        prompt = registry.chat_prompt(MESSAGES, parser=parser)
+        assert schema.call_count == 0
+
+        # First format renders the instructions once, and only once
+        prompt.format_messages(text="a")
+        prompt.format_messages(text="b")
+        assert schema.call_count == 1
+
+
+def test_warm_disk_cache_skips_schema_generation(tmp_path):
+    parser = PydanticOutputParser(pydantic_object=Summary)
+    PromptRegistry(cache_path=tmp_path / "instructions.json").format_instructions(parser)
+
+    registry = PromptRegistry(cache_path=tmp_path / "instructions.json")
+    with mock.patch.object(Summary, "model_json_schema", wraps=Summary.model_json_schema) as schema:
+        messages = registry.chat_prompt(MESSAGES, parser=parser).format_messages(text="a")
+    assert schema.call_count == 0
+    assert parser.get_format_instructions() in messages[0].content
+
+
+def test_schema_key_changes_with_constraints_and_nested_models():
+    class Point(BaseModel):
+        x: int
+
+    class Shape(BaseModel):
+        points: list[Point]
+
+    before = schema_key(PydanticOutputParser(pydantic_object=Shape))
+
+    class Point(BaseModel):  # noqa: F811 - same names, new constraint
+        x: int = Field(ge=0)
+
+    class Shape(BaseModel):  # noqa: F811
+        points: list[Point]
+
+    assert schema_key(PydanticOutputParser(pydantic_object=Shape)) != before
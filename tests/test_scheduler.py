@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from performance.scheduler import DeadlineExceeded, ModelScheduler
+
+
+class SlowFakeChat(FakeListChatModel):
+    latency: float = 0.0
+
+    def _call(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super()._call(*args, **kwargs)
+
+
+class Flaky:
+    """Raises each of `errors` once, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def scheduler_factory():
+    made = []
+
+    def make(**kwargs):
+        kwargs.setdefault("base_delay", 0.01)
+        made.append(ModelScheduler(**kwargs))
+        return made[-1]
+
+    yield make
+    for scheduler in made:
+        scheduler.shutdown(wait=False)
+
+
+def test_interactive_lane_is_dequeued_before_batch(scheduler_factory):
+    scheduler = scheduler_factory(workers=1)
+    release, order = threading.Event(), []
+    scheduler.submit(release.wait, priority="batch")
+    futures = [scheduler.submit(lambda i=i: order.append(f"batch{i}"), priority="batch") for i in range(3)]
+    futures.append(scheduler.submit(lambda: order.append("interactive"), priority="interactive"))
+    release.set()
+    for future in futures:
+        future.result(timeout=2)
+    assert order == ["interactive", "batch0", "batch1", "batch2"]
+
+
+def test_rate_limited_backend_does_not_hold_workers(scheduler_factory):
+    scheduler = scheduler_factory(rate_limits={"gem": 1.0}, workers=4)
+    for _ in range(8):
+        scheduler.submit(lambda: None, backend="gem", priority="batch")
+
+    started = time.monotonic()
+    scheduler.submit(lambda: None, backend="other", priority="interactive").result(timeout=2)
+    assert time.monotonic() - started < 0.2
+
+    # Same backend: next in line behind the bucket, ahead of the queued batch jobs
+    started = time.monotonic()
+    scheduler.submit(lambda: None, backend="gem", priority="interactive").result(timeout=3)
+    assert time.monotonic() - started < 1.2
+
+
+def test_request_queued_past_its_deadline_is_not_sent(scheduler_factory):
+    scheduler = scheduler_factory(workers=1)
+    release = threading.Event()
+    scheduler.submit(release.wait)
+    late = Flaky()
+    future = scheduler.submit(late, timeout=0.05)
+    time.sleep(0.1)
+    release.set()
+    with pytest.raises(DeadlineExceeded):
+        future.result(timeout=2)
+    assert late.calls == 0
+    assert scheduler.metrics_snapshot()["interactive"]["expired"] == 1
+
+
+def test_wrapped_model_stops_waiting_at_the_deadline(scheduler_factory):
+    scheduler = scheduler_factory(workers=1)
+    model = scheduler.wrap(SlowFakeChat(responses=["ok"], latency=0.5), backend="fake", timeout=0.1)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        model.invoke("hello")
+    assert time.monotonic() - started < 0.3
+
+
+def test_transient_errors_are_retried(scheduler_factory):
+    scheduler = scheduler_factory(workers=1)
+    flaky = Flaky(ConnectionError("reset"), TimeoutError("slow"))
+    assert scheduler.submit(flaky).result(timeout=2) == "ok"
+    assert flaky.calls == 3
+    assert scheduler.metrics_snapshot()["interactive"]["retries"] == 2
+
+
+def test_other_errors_fail_without_retry(scheduler_factory):
+    scheduler = scheduler_factory(workers=1)
+    flaky = Flaky(ValueError("bad request"))
+    with pytest.raises(ValueError):
+        scheduler.submit(flaky).result(timeout=2)
+    assert flaky.calls == 1
+
+
+def test_backoff_does_not_hold_the_worker(scheduler_factory):
+    scheduler = scheduler_factory(workers=1)
+    scheduler._backoff = lambda attempt: 0.3
+    flaky = Flaky(ConnectionError("reset"))
+    retried = scheduler.submit(flaky)
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert scheduler.submit(lambda: "next").result(timeout=2) == "next"
+    assert time.monotonic() - started < 0.1
+    assert retried.result(timeout=2) == "ok"
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from performance.singleflight import SingleFlight
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def main():
+        flight, calls = SingleFlight(), []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.create_task(flight.ado("q", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.ado("q", slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == "answer"
+        assert leader.cancelled() and not follower.cancelled()
+        assert calls == [1]
+        assert flight.stats() == {"backend_calls": 1, "coalesced": 1, "in_flight": 0}
+
+    asyncio.run(main())
+
+
+def test_followers_share_the_leaders_exception():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ConnectionError("backend down")
+
+        results = await asyncio.gather(*(flight.ado("q", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert flight.calls == 1
+
+    asyncio.run(main())
+
+
+def test_sync_callers_share_one_call():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 42) == 42
+    with pytest.raises(KeyError):
+        flight.do("k", lambda: {}["missing"])
+    assert flight.stats()["in_flight"] == 0
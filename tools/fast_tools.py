@@ -0,0 +1,158 @@
+"""Fast invocation path for StructuredTool / @tool functions.
+
+`tool.invoke({"a": 5, "b": 7})` sets up callbacks, builds a run, validates the
+arguments through the tool's generated Pydantic `args_schema`, dumps the
+model back to a dict and finally calls `a + b`. For tiny tools that overhead
+dwarfs the work. `FastTool` keeps the validation but skips the rest:
+
+- validators are compiled once per schema and reused (`compiled_validators`);
+  plain schemas validate straight into a TypedDict of call arguments,
+- `batch()` validates a whole list of argument dicts in a single call,
+- `trusted=True` skips validation entirely, for arguments we produced
+  ourselves (e.g. already validated upstream).
+
+The fast path does not emit callbacks; use `tool.invoke` when you need tracing.
+
+Run this file for a micro-benchmark against the stock `invoke`.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Annotated, Any, Callable
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, TypeAdapter, ValidationError, with_config
+from typing_extensions import NotRequired, TypedDict
+
+Validator = Callable[[dict[str, Any]], dict[str, Any]]
+BatchValidator = Callable[[list[dict[str, Any]]], list[dict[str, Any]]]
+
+# schema -> (validate one args dict, validate a list of them), built once per schema
+_VALIDATORS: dict[type[BaseModel], tuple[Validator, BatchValidator]] = {}
+
+
+def _needs_model(schema: type[BaseModel]) -> bool:
+    # Custom validators, aliases and a few config keys only apply on the
+    # model itself; the rest of model_config is copied onto the TypedDict.
+    decorators = schema.__pydantic_decorators__
+    config = schema.model_config
+    return bool(
+        decorators.validators or decorators.field_validators
+        or decorators.root_validators or decorators.model_validators
+        or config.get("strict") or config.get("extra") == "forbid" or config.get("alias_generator")
+        or any(field.alias or field.validation_alias for field in schema.model_fields.values())
+    )
+
+
+def _compile(schema: type[BaseModel]) -> tuple[Validator, BatchValidator]:
+    if _needs_model(schema):
+        # Validators may depend on the model instance, so validate through it
+        # and hand back the arguments the caller actually passed (like BaseTool).
+        fields = frozenset(schema.model_fields)
+        validate_model = schema.__pydantic_validator__.validate_python
+
+        def one(args: dict[str, Any]) -> dict[str, Any]:
+            model = validate_model(args)
+            return {k: getattr(model, k) for k in args if k in fields}
+
+        return one, lambda args_list: [one(args) for args in args_list]
+
+    # Plain field schemas: validate into a TypedDict with the same annotations,
+    # constraints and config (str_strip_whitespace etc.). No model instances
+    # are built, which is ~10x faster for lists, and unknown keys are dropped
+    # just as BaseTool does.
+    annotations = {}
+    for name, field in schema.model_fields.items():
+        annotation = Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+        annotations[name] = annotation if field.is_required() else NotRequired[annotation]
+    arguments = with_config(schema.model_config)(
+        TypedDict(f"{schema.__name__}Args", annotations)  # type: ignore[operator]
+    )
+    return TypeAdapter(arguments).validate_python, TypeAdapter(list[arguments]).validate_python
+
+
+def compiled_validators(schema: type[BaseModel]) -> tuple[Validator, BatchValidator]:
+    """Return (validate_one, validate_many) for `schema`, compiling on first use."""
+    cached = _VALIDATORS.get(schema)
+    if cached is None:
+        cached = _VALIDATORS[schema] = _compile(schema)
+    return cached
+
+
+class FastTool:
+    """Low-overhead wrapper around a sync StructuredTool."""
+
+    def __init__(self, tool: BaseTool, trusted: bool = False):
+        func = getattr(tool, "func", None)
+        if func is None:
+            raise ValueError(f"Tool {tool.name!r} has no sync function to call.")
+        schema = tool.args_schema
+        if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+            raise TypeError(f"Tool {tool.name!r} needs a Pydantic args_schema, got {schema!r}.")
+
+        self.tool = tool
+        self.name = tool.name
+        self.func = func
+        self.trusted = trusted
+        self._validate_one, self._validate_many = compiled_validators(schema)
+
+    def invoke(self, args: dict[str, Any], trusted: bool | None = None) -> Any:
+        if self.trusted if trusted is None else trusted:
+            return self.func(**args)
+        return self.func(**self._validate_one(args))
+
+    def batch(self, args_list: list[dict[str, Any]], trusted: bool | None = None, return_exceptions: bool = False) -> list[Any]:
+        """Validate all argument dicts at once, then run the tool on each."""
+        if self.trusted if trusted is None else trusted:
+            validated = args_list
+        else:
+            try:
+                validated = self._validate_many(args_list)
+            except ValidationError:
+                if not return_exceptions:
+                    raise
+                validated = None
+
+        results = []
+        for i, args in enumerate(args_list):
+            try:
+                # After a failed list validation, re-validate one by one so only
+                # the bad entries become errors.
+                kwargs = validated[i] if validated is not None else self._validate_one(args)
+                results.append(self.func(**kwargs))
+            except Exception as exc:  # noqa: BLE001 - returned, as in Runnable.batch
+                if not return_exceptions:
+                    raise
+                results.append(exc)
+        return results
+
+
+if __name__ == "__main__":
+    from structured_tools import add_numbers_tool
+    from toolkit import multiply_numbers
+
+    CALLS = 20_000
+
+    def per_call_us(fn: Callable[[], Any], calls: int = CALLS) -> float:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        return (time.perf_counter() - start) / calls * 1e6
+
+    for tool in (add_numbers_tool, multiply_numbers):
+        fast = FastTool(tool)
+        args = {"a": 5, "b": 7}
+        args_list = [{"a": i, "b": 7} for i in range(CALLS)]
+        assert fast.invoke(args) == tool.invoke(args)
+
+        stock_us = per_call_us(lambda: tool.invoke(args))
+        rows = [
+            ("stock tool.invoke", stock_us),
+            ("FastTool.invoke", per_call_us(lambda: fast.invoke(args))),
+            ("FastTool.invoke(trusted=True)", per_call_us(lambda: fast.invoke(args, trusted=True))),
+            ("FastTool.batch (per item)", per_call_us(lambda: fast.batch(args_list), 1) / CALLS),
+        ]
+        print(f"--- {tool.name} ({CALLS} calls) ---")
+        for name, us in rows:
+            print(f"{name:<32}{us:>9.2f} us/call{stock_us / us:>8.1f}x")
@@ -18,7 +18,8 @@ add_numbers_tool = StructuredTool.from_function(
     args_schema = AddNumbersInput,
 )
 
-result = add_numbers_tool.invoke({'a': 5, 'b': 7})
-print(f"The result of addition is: {result}")
-print(f"Tool args: {add_numbers_tool.args}")
-print(f"Tool description: {add_numbers_tool.description}")
\ No newline at end of file
+if __name__ == "__main__":
+    result = add_numbers_tool.invoke({'a': 5, 'b': 7})
+    print(f"The result of addition is: {result}")
+    print(f"Tool args: {add_numbers_tool.args}")
+    print(f"Tool description: {add_numbers_tool.description}")
@@ -0,0 +1,192 @@
+"""Tool binding and parallel tool execution.
+
+A model bound to tools can ask for several tool calls in one turn
+(`AIMessage.tool_calls`). Running them one after another means the turn
+takes as long as the sum of their latencies. `ToolExecutor`:
+
+- runs the independent calls of one turn concurrently (threads, or asyncio
+  with `aexecute`),
+- gives every call a timeout, so one slow tool cannot stall the turn,
+- memoizes results of tools marked as pure (same args -> same result),
+- returns one ToolMessage per call, in the order the model asked for them;
+  errors and timeouts become ToolMessages with status="error" so the model
+  can see and react to them.
+
+Usage:
+    executor = ToolExecutor(tools, pure={"multiply_numbers", "power_numbers"})
+    llm_with_tools = executor.bind(ChatOllama(model="gemma3:27b-cloud"))
+    answer = executor.run(llm_with_tools, "What is 8 * 2 and 8 ** 2?")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Iterable
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+
+class ToolExecutor:
+    """Executes the tool calls of one model turn concurrently."""
+
+    def __init__(
+        self,
+        tools: Iterable[BaseTool],
+        pure: Iterable[str] = (),
+        timeout: float = 30.0,
+        timeouts: dict[str, float] | None = None,
+        max_workers: int = 8,
+        memo_size: int = 1024,
+    ):
+        self.tools = {t.name: t for t in tools}
+        self.pure = set(pure)
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.memo_size = memo_size
+        self._memo: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.memo_hits = 0
+
+    # --- memoization ---
+
+    @staticmethod
+    def _memo_key(name: str, args: dict[str, Any]) -> tuple[str, str]:
+        return name, json.dumps(args, sort_keys=True, default=str)
+
+    def _memo_get(self, key: tuple[str, str]) -> tuple[bool, Any]:
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return True, self._memo[key]
+        return False, None
+
+    def _memo_put(self, key: tuple[str, str], value: Any) -> None:
+        with self._memo_lock:
+            self._memo[key] = value
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    # --- single call ---
+
+    def _message(self, call: dict[str, Any], content: Any, status: str = "success") -> ToolMessage:
+        return ToolMessage(content=str(content), name=call["name"], tool_call_id=call["id"], status=status)
+
+    def _lookup(self, call: dict[str, Any]) -> tuple[BaseTool | None, tuple[str, str] | None]:
+        tool = self.tools.get(call["name"])
+        key = self._memo_key(call["name"], call["args"]) if call["name"] in self.pure else None
+        return tool, key
+
+    # --- a whole turn ---
+
+    def execute(self, tool_calls: list[dict[str, Any]]) -> list[ToolMessage]:
+        """Run `tool_calls` (as found on AIMessage.tool_calls) concurrently."""
+        results: list[ToolMessage | None] = [None] * len(tool_calls)
+        pending = []
+        for i, call in enumerate(tool_calls):
+            tool, key = self._lookup(call)
+            if tool is None:
+                results[i] = self._message(call, f"Error: unknown tool {call['name']!r}", "error")
+                continue
+            if key is not None:
+                hit, value = self._memo_get(key)
+                if hit:
+                    results[i] = self._message(call, value)
+                    continue
+            timeout = self.timeouts.get(call["name"], self.timeout)
+            deadline = time.monotonic() + timeout
+            pending.append((i, call, key, timeout, deadline, self._pool.submit(tool.invoke, call["args"])))
+
+        # All calls are already running; each gets `timeout` from its own submission.
+        for i, call, key, timeout, deadline, future in pending:
+            try:
+                value = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()  # no effect once running, but frees queued work
+                results[i] = self._message(call, f"Error: {call['name']} timed out after {timeout}s", "error")
+            except Exception as exc:  # noqa: BLE001 - surfaced to the model, not raised
+                results[i] = self._message(call, f"Error: {exc}", "error")
+            else:
+                if key is not None:
+                    self._memo_put(key, value)
+                results[i] = self._message(call, value)
+        return results  # type: ignore[return-value]
+
+    async def aexecute(self, tool_calls: list[dict[str, Any]]) -> list[ToolMessage]:
+        """Async variant: one task per call, each under its own timeout."""
+
+        async def run_one(call: dict[str, Any]) -> ToolMessage:
+            tool, key = self._lookup(call)
+            if tool is None:
+                return self._message(call, f"Error: unknown tool {call['name']!r}", "error")
+            if key is not None:
+                hit, value = self._memo_get(key)
+                if hit:
+                    return self._message(call, value)
+            timeout = self.timeouts.get(call["name"], self.timeout)
+            try:
+                value = await asyncio.wait_for(tool.ainvoke(call["args"]), timeout)
+            except asyncio.TimeoutError:
+                return self._message(call, f"Error: {call['name']} timed out after {timeout}s", "error")
+            except Exception as exc:  # noqa: BLE001
+                return self._message(call, f"Error: {exc}", "error")
+            if key is not None:
+                self._memo_put(key, value)
+            return self._message(call, value)
+
+        return list(await asyncio.gather(*(run_one(call) for call in tool_calls)))
+
+    # --- binding and the agent loop ---
+
+    def bind(self, model: Any) -> Any:
+        """Bind this executor's tools to a chat model."""
+        return model.bind_tools(list(self.tools.values()))
+
+    def run(self, model_with_tools: Any, question: str | list[BaseMessage], max_turns: int = 5) -> AIMessage:
+        """Call the model, execute its tool calls, feed results back; repeat."""
+        messages = [HumanMessage(content=question)] if isinstance(question, str) else list(question)
+        for _ in range(max_turns):
+            reply = model_with_tools.invoke(messages)
+            messages.append(reply)
+            if not reply.tool_calls:
+                return reply
+            messages.extend(self.execute(reply.tool_calls))
+        return reply
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    from toolkit import MathTools
+
+    executor = ToolExecutor(MathTools().get_tools(), pure={"multiply_numbers", "power_numbers"}, timeout=5)
+
+    # A turn as a tool-calling model would emit it (no model needed to try this).
+    turn = AIMessage(content="", tool_calls=[
+        {"name": "multiply_numbers", "args": {"a": 8, "b": 2}, "id": "call_1"},
+        {"name": "divide_numbers", "args": {"a": 8, "b": 0}, "id": "call_2"},
+        {"name": "power_numbers", "args": {"a": 8, "b": 2}, "id": "call_3"},
+        {"name": "subtract_numbers", "args": {"a": 8, "b": 2}, "id": "call_4"},
+    ])
+
+    for attempt in ("first run", "memoized"):
+        start = time.perf_counter()
+        messages = executor.execute(turn.tool_calls)
+        print(f"--- {attempt} ({(time.perf_counter() - start) * 1000:.2f} ms) ---")
+        for m in messages:
+            print(f"{m.name} [{m.status}]: {m.content}")
+    print(f"Memo hits: {executor.memo_hits}")
+
+    # With a real model:
+    # from langchain_ollama import ChatOllama
+    # llm_with_tools = executor.bind(ChatOllama(model="gemma3:27b-cloud", temperature=0))
+    # print(executor.run(llm_with_tools, "What is 8 times 2, and 8 to the power of 2?").content)
+    executor.shutdown()
@@ -1,3 +1,6 @@
+from typing import List, Union
+
+import numpy as np
 from langchain_core.tools import tool
 
 @tool
@@ -24,6 +27,102 @@ def power_numbers(a: float, b: float) -> float:
     return a ** b
 
 
+# --- BATCH (VECTORIZED) VERSIONS ---
+# One call computes a whole list of operations with NumPy.
+# Broadcasting rules: a and b are each a number or a list of numbers.
+#   - number with list  -> the number is used for every element
+#   - list with list    -> element-wise, lists must have the same length
+#                          (a list of length 1 counts as a number)
+# Elements that cannot be computed (divide by zero, overflow, non-real powers)
+# come back as None in "results" with a matching entry in "errors";
+# the rest of the batch is still returned.
+
+Operands = Union[float, List[float]]
+
+
+def _operands(a, b):
+    a, b = np.atleast_1d(np.asarray(a, dtype=float)), np.atleast_1d(np.asarray(b, dtype=float))
+    if a.ndim != 1 or b.ndim != 1:
+        raise ValueError("a and b must be numbers or flat lists of numbers.")
+    if len(a) != len(b) and 1 not in (len(a), len(b)):
+        raise ValueError(
+            f"Cannot pair {len(a)} values of a with {len(b)} values of b: "
+            "use lists of the same length or a single number."
+        )
+    return np.broadcast_arrays(a, b)
+
+
+def _batch_result(values, error_masks):
+    """Turn an array plus {message: mask} into {"results": [...], "errors": [...]}."""
+    results = values.astype(object)
+    errors = []
+    failed = np.zeros(len(values), dtype=bool)
+    for message, mask in error_masks.items():
+        mask = mask & ~failed  # report the first problem per element only
+        errors.extend({"index": int(i), "error": message} for i in np.flatnonzero(mask))
+        failed |= mask
+    results[failed] = None
+    errors.sort(key=lambda e: e["index"])
+    return {"results": results.tolist(), "errors": errors}
+
+
+def multiply_arrays(a, b):
+    a, b = _operands(a, b)
+    with np.errstate(over="ignore", invalid="ignore"):
+        values = a * b
+    return _batch_result(values, {"Result overflowed.": np.isinf(values) & np.isfinite(a) & np.isfinite(b)})
+
+
+def divide_arrays(a, b):
+    a, b = _operands(a, b)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        values = a / b
+    return _batch_result(values, {
+        "Cannot divide by zero.": b == 0,
+        "Result overflowed.": np.isinf(values) & np.isfinite(a) & np.isfinite(b),
+    })
+
+
+def subtract_arrays(a, b):
+    a, b = _operands(a, b)
+    with np.errstate(over="ignore", invalid="ignore"):
+        values = a - b
+    return _batch_result(values, {"Result overflowed.": np.isinf(values) & np.isfinite(a) & np.isfinite(b)})
+
+
+def power_arrays(a, b):
+    a, b = _operands(a, b)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        values = np.power(a, b)
+    return _batch_result(values, {
+        "Cannot raise zero to a negative power.": (a == 0) & (b < 0),
+        "Result is not a real number.": np.isnan(values) & ~np.isnan(a) & ~np.isnan(b),
+        "Result overflowed.": np.isinf(values) & np.isfinite(a) & np.isfinite(b),
+    })
+
+
+@tool
+def multiply_numbers_batch(a: Operands, b: Operands) -> dict:
+    """Multiplies numbers element-wise. a and b are numbers or equal-length lists of numbers."""
+    return multiply_arrays(a, b)
+
+@tool
+def divide_numbers_batch(a: Operands, b: Operands) -> dict:
+    """Divides a by b element-wise. a and b are numbers or equal-length lists of numbers.
+    Division by zero is reported per element in "errors"."""
+    return divide_arrays(a, b)
+
+@tool
+def subtract_numbers_batch(a: Operands, b: Operands) -> dict:
+    """Subtracts b from a element-wise. a and b are numbers or equal-length lists of numbers."""
+    return subtract_arrays(a, b)
+
+@tool
+def power_numbers_batch(a: Operands, b: Operands) -> dict:
+    """Raises a to the power of b element-wise. a and b are numbers or equal-length lists of numbers."""
+    return power_arrays(a, b)
+
+
 class MathTools:
 
     def get_tools(self):
@@ -33,13 +132,26 @@ class MathTools:
             subtract_numbers,
             power_numbers,
         ]
+
+    def get_batch_tools(self):
+        """Vectorized variants for bulk requests: one call instead of one per element."""
+        return [
+            multiply_numbers_batch,
+            divide_numbers_batch,
+            subtract_numbers_batch,
+            power_numbers_batch,
+        ]
    
 
-toolkit = MathTools()
-tools = toolkit.get_tools()
+if __name__ == "__main__":
+    toolkit = MathTools()
+    tools = toolkit.get_tools()
+
+    for t in tools:
+        result = t.invoke({'a': 8, 'b': 2})
+        print(f"The result of {t.name} is: {result}")
+        print(f"Tool args: {t.args}")
+        print(f"Tool description: {t.description}")
 
-for t in tools:
-    result = t.invoke({'a': 8, 'b': 2})
-    print(f"The result of {t.name} is: {result}")
-    print(f"Tool args: {t.args}")
-    print(f"Tool description: {t.description}")
\ No newline at end of file
+    batch_result = divide_numbers_batch.invoke({'a': [8, 9, 10], 'b': [2, 0, 4]})
+    print(f"The result of {divide_numbers_batch.name} is: {batch_result}")